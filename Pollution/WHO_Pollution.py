@@ -0,0 +1,16 @@
+import os
+import sys
+
+#Makes the shared gho package at the root of the repository importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gho import load_registry, parse_args, run_topic
+
+#The keywords, output files and SpatialDim column name of this topic are declared once, in its
+#[pollution] table of topics.toml at the root of the repository
+TOPIC = "pollution"
+
+
+if __name__ == "__main__":
+    options = parse_args()
+
+    run_topic(load_registry()[TOPIC], options)
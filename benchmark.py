@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+
+#Makes the shared gho package at the root of the repository importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gho import build_parser, load_registry, options_from_args, select_topics
+from gho.bench import HISTORY_PATH, append_history, print_results, read_history, run_benchmarks
+from gho.standin import start_standin_process
+
+
+if __name__ == "__main__":
+    registry = load_registry()
+
+    parser = build_parser("Time the catalog, find, fetch, reshape and save stages of WHO GHO topics")
+    parser.add_argument("--topics", default=None,
+                        help="comma separated topics to benchmark (default all): " + ", ".join(registry))
+    parser.add_argument("--standin", default=None, metavar="FIXTURES",
+                        help="serve the API from this fixture folder with the local stand-in during the benchmark")
+    parser.add_argument("--history", default=HISTORY_PATH,
+                        help="JSON lines file the results are appended to (default benchmark_history.jsonl)")
+    parser.add_argument("--no-history", action="store_true", help="print the results without saving them")
+    args = parser.parse_args()
+    options = options_from_args(args)
+
+    #A fresh cache for every benchmark, so no earlier run's caches change what gets fetched
+    if options.cache_dir is None:
+        options.cache_dir = tempfile.mkdtemp(prefix="gho_bench_cache_")
+
+    if args.standin:
+        #The stand-in runs in a process of its own, so the fixtures it holds are not part of the
+        #memory of this process, and so of the topic processes it starts
+        server, api_url = start_standin_process(args.standin)
+        #The topic processes read GHO_API_URL when they start
+        os.environ["GHO_API_URL"] = api_url
+        source = f"standin:{os.path.basename(os.path.abspath(args.standin))}"
+    elif options.replay:
+        source = f"replay:{os.path.basename(os.path.abspath(options.replay))}"
+    else:
+        source = f"api:{os.environ.get('GHO_API_URL', 'ghoapi')}"
+
+    names = [t.strip() for t in args.topics.split(",")] if args.topics else list(registry)
+    names = [topic.name for topic in select_topics(registry, names)]
+
+    history = read_history(args.history)
+    results = run_benchmarks(names, options, source)
+    print_results(results, history)
+    if not args.no_history:
+        append_history(results, args.history)
+        print(f"\n Results appended to {args.history}")
@@ -0,0 +1,35 @@
+import os
+import sys
+
+#Makes the shared gho package at the root of the repository importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gho import build_parser, keyword_report, load_catalog, load_index, load_registry, options_from_args, \
+    print_keyword_report, select_topics
+
+
+if __name__ == "__main__":
+    registry = load_registry()
+
+    parser = build_parser("Check the keywords of topics.toml against the GHO indicator catalog")
+    parser.add_argument("--topics", default=None,
+                        help="comma separated topics to check (default all): " + ", ".join(registry))
+    parser.add_argument("--search", default=None,
+                        help="print the indicators whose name or code contains this text instead")
+    args = parser.parse_args()
+    options = options_from_args(args)
+
+    index = load_index(load_catalog(options), options)
+
+    if args.search:
+        found = index.search(args.search)
+        if not found:
+            near = index.fuzzy(args.search)
+            if near:
+                print(f"No indicator contains '{args.search}', showing '{near[0]}'")
+                found = index.search(near[0])
+        for code, name in found:
+            print(f" {code}: {name}")
+        print(f"{len(found)} indicators")
+    else:
+        names = [t.strip() for t in args.topics.split(",")] if args.topics else None
+        print_keyword_report(keyword_report(select_topics(registry, names), index))
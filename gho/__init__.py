@@ -0,0 +1,14 @@
+#Shared helpers used by the topic scripts to pull data from the WHO GHO OData API
+from .catalog import default_cache_dir, load_catalog
+from .chunked import run_topics_in_blocks
+from .cli import build_parser, options_from_args, parse_args
+from .client import connection_stats, get_session
+from .compact import compact_long, read_long_csv
+from .cube import ObservationCube, load_cube, save_cube
+from .fetch import GHO_API_URL, FetchReport, complete_run, fetch_indicator_data
+from .index import CatalogIndex, keyword_report, load_index, print_keyword_report
+from .options import DEFAULT_CATALOG_TTL_HOURS, DEFAULT_WORKERS, FetchOptions
+from .pipeline import find_indicators, run_topic, run_topics
+from .registry import Topic, load_registry, select_topics
+from .reshape import SparseWide, pivot_wide
+from .stream import decode_columns
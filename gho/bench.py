@@ -0,0 +1,180 @@
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import pandas as pd
+
+from .catalog import load_catalog
+from .fetch import FetchReport, fetch_indicator_data
+from .pipeline import clean_and_reshape, find_indicators
+from .registry import NEEDED_COLS, ROOT, load_registry
+
+#resource only exists on Unix; elsewhere the peak memory is left out of the results
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+HISTORY_PATH = os.path.join(ROOT, "benchmark_history.jsonl")
+STAGES = ["catalog", "find", "fetch", "reshape", "save"]
+
+#A stage this much slower than the previous commit's run is flagged
+REGRESSION_RATIO = 1.2
+
+
+#Peak resident memory of this process so far in MB. On Linux it is read from VmHWM, which belongs to
+#the process alone: ru_maxrss also counts the memory of the parent the process was forked from,
+#so every spawned topic would report at least the benchmark process itself. Elsewhere ru_maxrss
+#(in KB on Linux, bytes on macOS) is the best there is
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if platform.system() == "Darwin" else 1024), 1)
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+#Options that change how the tables are held, recorded with every result: runs are only compared
+#with earlier runs in the same modes
+def modes(options):
+    return [flag for flag in ("compact", "float32", "sparse") if getattr(options, flag, False)]
+
+
+#Runs one topic stage by stage and returns its timings; runs in its own process so the peak
+#memory belongs to this topic alone. The outputs go to out_dir, never over the tracked CSVs
+def run_topic_benchmark(name, options, out_dir):
+    topic = load_registry()[name]
+    seconds, peaks = {}, {}
+
+    def stage(label, start):
+        seconds[label] = round(time.perf_counter() - start, 4)
+        peaks[label] = peak_rss_mb()
+
+    start = time.perf_counter()
+    ind_df = load_catalog(options)
+    stage("catalog", start)
+
+    start = time.perf_counter()
+    codes = list(find_indicators(topic, ind_df, options)["IndicatorCode"])
+    stage("find", start)
+
+    start = time.perf_counter()
+    df = fetch_indicator_data(codes, options, FetchReport(), columns=NEEDED_COLS)
+    stage("fetch", start)
+    if df.empty:
+        return {"topic": name, "modes": modes(options), "indicators": len(codes), "rows": 0,
+                "seconds": seconds, "peak_rss_mb": peaks}
+
+    start = time.perf_counter()
+    #The same options as the topic's own run, so --compact, --float32 and --sparse are benchmarked
+    clean, wide = clean_and_reshape(topic, df, options)
+    stage("reshape", start)
+
+    #to_csv writes a SparseWide (--sparse) one row at a time, as save_outputs does
+    start = time.perf_counter()
+    long_path = os.path.join(out_dir, f"{name}_long.csv")
+    wide_path = os.path.join(out_dir, f"{name}_wide.csv")
+    clean.to_csv(long_path, index=False)
+    wide.to_csv(wide_path)
+    stage("save", start)
+
+    return {
+        "topic": name,
+        "modes": modes(options),
+        "indicators": len(codes),
+        "rows": len(clean),
+        "wide_shape": list(wide.shape),
+        "csv_mb": round((os.path.getsize(long_path) + os.path.getsize(wide_path)) / 1e6, 2),
+        "seconds": seconds,
+        "peak_rss_mb": peaks,
+    }
+
+
+def warm_catalog(options):
+    return len(load_catalog(options))
+
+
+#Runs fn in a fresh process (spawned, not forked, so it starts with nothing loaded)
+def in_fresh_process(fn, *args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(fn, *args).result()
+
+
+#Benchmarks every topic in a fresh process, one after the other, and returns one record per topic
+#The catalog is cached first, so every topic's catalog stage reads the same cached copy
+def run_benchmarks(names, options, source):
+    out_dir = tempfile.mkdtemp(prefix="gho_bench_")
+    commit = git_commit()
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+    in_fresh_process(warm_catalog, options)
+
+    results = []
+    for name in names:
+        print(f"\n Benchmarking {name}")
+        result = in_fresh_process(run_topic_benchmark, name, options, out_dir)
+        result.update({"timestamp": stamp, "commit": commit, "source": source, "workers": options.workers,
+                       "python": platform.python_version(), "pandas": pd.__version__})
+        results.append(result)
+    return results
+
+
+def read_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(results, path=HISTORY_PATH):
+    with open(path, "a", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+
+
+#Latest earlier run of the same topic on the same input, in the same modes, from another commit
+def previous_result(history, result):
+    for old in reversed(history):
+        if (old["topic"] == result["topic"] and old["source"] == result["source"]
+                and old.get("modes", []) == result.get("modes", [])
+                and old.get("commit") != result.get("commit")):
+            return old
+    return None
+
+
+def print_results(results, history):
+    print(f"\n {'topic':<18}{'rows':>9}" + "".join(f"{s:>10}" for s in STAGES) + f"{'peak MB':>10}")
+    for result in results:
+        peaks = [p for p in result["peak_rss_mb"].values() if p is not None]
+        line = f" {result['topic']:<18}{result['rows']:>9}"
+        line += "".join(f"{result['seconds'].get(s, float('nan')):>10.3f}" for s in STAGES)
+        line += f"{max(peaks):>10.1f}" if peaks else f"{'-':>10}"
+        print(line)
+
+        old = previous_result(history, result)
+        if old is None:
+            continue
+        for s in STAGES:
+            new_s, old_s = result["seconds"].get(s), old["seconds"].get(s)
+            if new_s and old_s and new_s > old_s * REGRESSION_RATIO and new_s - old_s > 0.01:
+                print(f"   {s} is {new_s / old_s:.1f}x slower than at {old.get('commit')} ({old_s:.3f}s)")
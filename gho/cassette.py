@@ -0,0 +1,132 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+INDEX_FILE = "index.jsonl"
+
+#Response headers worth keeping, the rest describe the transfer rather than the answer
+KEPT_HEADERS = ["Content-Type", "Retry-After"]
+
+#Cassettes opened by this process, one per folder and mode
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+#Raised in replay mode for a request the cassette never saw
+class CassetteMiss(requests.RequestException):
+    pass
+
+
+#Key of a request: its path and sorted query, without the host, so a cassette recorded against
+#the GHO API replays the same against the local stand-in and the other way round
+def request_key(url, params=None):
+    prepared = requests.Request("GET", url, params=params).prepare().url
+    parts = urlsplit(prepared)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{parts.path}?{query}" if query else parts.path
+
+
+#Folder of recorded responses: index.jsonl maps every request to its status, headers and the
+#sha256 of its body, and every distinct body is stored once, gzipped, under blobs/<sha256>.gz
+class Cassette:
+    def __init__(self, path, mode):
+        self.path = path
+        self.mode = mode
+        self.entries = {}
+        self.stored = set()
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        index = os.path.join(path, INDEX_FILE)
+        if mode == "replay" and not os.path.exists(index):
+            raise SystemExit(f"No cassette to replay in {path}, record one with --record first")
+
+        os.makedirs(os.path.join(path, "blobs"), exist_ok=True)
+        if os.path.exists(index):
+            with open(index, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry
+                        self.stored.add(entry["sha256"])
+
+    def blob_path(self, sha256):
+        return os.path.join(self.path, "blobs", f"{sha256}.gz")
+
+    #Stores the final response of a request (after any retries) and returns it still readable
+    def record(self, url, params, resp):
+        body = resp.content
+        sha256 = hashlib.sha256(body).hexdigest()
+        entry = {
+            "key": request_key(url, params),
+            "status": resp.status_code,
+            "headers": {h: resp.headers[h] for h in KEPT_HEADERS if h in resp.headers},
+            "sha256": sha256,
+        }
+
+        with self._lock:
+            if sha256 not in self.stored:
+                tmp_path = f"{self.blob_path(sha256)}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(gzip.compress(body))
+                os.replace(tmp_path, self.blob_path(sha256))
+                self.stored.add(sha256)
+
+            with open(os.path.join(self.path, INDEX_FILE), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self.entries[entry["key"]] = entry
+            self.recorded += 1
+        return resp
+
+    #Builds the recorded response of a request without touching the network
+    def replay(self, url, params=None):
+        key = request_key(url, params)
+        entry = self.entries.get(key)
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            raise CassetteMiss(f"{key} is not in the cassette {self.path}")
+
+        with open(self.blob_path(entry["sha256"]), "rb") as f:
+            body = gzip.decompress(f.read())
+
+        resp = requests.Response()
+        resp.status_code = entry["status"]
+        resp.headers = CaseInsensitiveDict(entry["headers"])
+        resp.url = url
+        resp._content = body
+        resp._content_consumed = True
+        with self._lock:
+            self.replayed += 1
+        return resp
+
+    def summary(self):
+        if self.mode == "record":
+            size = sum(os.path.getsize(self.blob_path(sha)) for sha in self.stored)
+            return (f" Cassette: {self.recorded} responses recorded, {len(self.stored)} distinct bodies "
+                    f"({size / 1e6:.1f} MB compressed) in {self.path}")
+        return f" Cassette: {self.replayed} responses replayed from {self.path}, {self.misses} not found"
+
+
+#Cassette of the run, or None when neither --record nor --replay was given
+def get_cassette(options):
+    if options.record:
+        path, mode = options.record, "record"
+    elif options.replay:
+        path, mode = options.replay, "replay"
+    else:
+        return None
+
+    with _cassettes_lock:
+        if (path, mode) not in _cassettes:
+            _cassettes[(path, mode)] = Cassette(path, mode)
+        return _cassettes[(path, mode)]
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+from . import client
+from .client import GHO_API_URL
+from .options import FetchOptions
+
+
+CATALOG_URL = f"{GHO_API_URL}/Indicator"
+CATALOG_FILE = "indicator_catalog.json"
+
+#Catalog loaded by this process, so several topics run together only read the file once
+_loaded = {}
+
+
+#Folder where the shared caches live (the GHO_CACHE_DIR environment variable overrides the default)
+def default_cache_dir():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.environ.get("GHO_CACHE_DIR", os.path.join(root, ".gho_cache"))
+
+
+def cache_dir(options):
+    path = options.cache_dir or default_cache_dir()
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+#Hash of the catalog rows, stored next to them to detect damaged files and catalog changes
+def catalog_hash(rows):
+    payload = json.dumps(rows, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+#Hash of the codes and names of a loaded catalog, the key of the caches derived from them
+def names_hash(ind_df):
+    names = ind_df[["IndicatorCode", "IndicatorName"]].astype(str)
+    return hashlib.sha256(pd.util.hash_pandas_object(names, index=False).values.tobytes()).hexdigest()
+
+
+#Writes the file under a temporary name first so a concurrent reader never sees half of it
+def write_json_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+#Downloads every page of the GHO indicator catalog
+def download_catalog(options=None):
+    all_rows = []
+    url = CATALOG_URL
+
+    while url:
+        print("Fetching indicators page", url)
+        resp = client.get(url, options)
+        resp.raise_for_status()
+        js = resp.json()
+        all_rows.extend(js.get("value", []))
+        url = js.get("@odata.nextLink")
+
+    return all_rows
+
+
+#Reads the cached catalog, or returns None when it is missing or damaged
+def read_cached_catalog(path):
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        print("Indicator catalog cache is unreadable, fetching it again")
+        return None
+
+    if catalog_hash(cached.get("rows", [])) != cached.get("sha256"):
+        print("Indicator catalog cache failed its hash check, fetching it again")
+        return None
+
+    return cached
+
+
+#A catalog cached from another server (GHO_API_URL) is never fresh
+def is_fresh(cached, ttl_hours):
+    if cached is None or cached.get("url") != CATALOG_URL:
+        return False
+    return (time.time() - cached["fetched_at"]) / 3600 <= ttl_hours
+
+
+#Returns the GHO indicator catalog as a dataframe, fetching it only when the cache is stale
+#A forced refresh happens at most once per process, later topics reuse the refreshed copy
+def load_catalog(options=None):
+    options = options or FetchOptions()
+    path = os.path.join(cache_dir(options), CATALOG_FILE)
+
+    #A cassette holds the catalog of its snapshot, so recording and replaying bypass the cache
+    if options.record or options.replay:
+        key = options.record or options.replay
+        if key not in _loaded:
+            _loaded[key] = {"rows": download_catalog(options)}
+        return pd.DataFrame(_loaded[key]["rows"])
+
+    cached = previous = _loaded.get(path)
+    if not is_fresh(cached, options.catalog_ttl):
+        cached = previous = read_cached_catalog(path)
+        if options.refresh_catalog and path not in _loaded:
+            cached = None
+
+    if is_fresh(cached, options.catalog_ttl):
+        print("Using cached indicator catalog", path)
+    else:
+        rows = download_catalog(options)
+        fetched = {"fetched_at": time.time(), "url": CATALOG_URL, "sha256": catalog_hash(rows), "rows": rows}
+        if previous is not None and previous["sha256"] != fetched["sha256"]:
+            print("Indicator catalog changed since it was last cached")
+        write_json_atomic(path, fetched)
+        cached = fetched
+
+    _loaded[path] = cached
+    return pd.DataFrame(cached["rows"])
@@ -0,0 +1,247 @@
+import math
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from . import delta, odata, spool, stream
+from .fetch import FetchReport, fetch_to_spool
+from .options import FetchOptions
+from .pipeline import clean_rows, match_topics
+from .registry import NEEDED_COLS
+from .reshape import pivot_keys, pivot_wide, sparse_wide
+
+
+#Peak memory of reshaping a block, per byte its indicators take in the spool (the pickled column
+#buffers loaded back, the frame built from them, the clean rows and the integer keys of the pivot)
+MEMORY_PER_SPOOL_BYTE = 14
+
+#Most block files read at the same time while the wide CSV is stitched together
+MAX_OPEN_BLOCKS = 128
+
+#Blocks per worker process the suite is cut into, so a worker that drew small blocks picks up more
+BLOCKS_PER_WORKER = 4
+
+
+#Quotes a CSV field the way the csv module (and so pandas) does by default
+def quote(value):
+    text = str(value)
+    if any(c in text for c in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+#Splits codes, in their order, into blocks of at most limit spooled bytes
+#An indicator larger than the limit on its own gets a block of its own
+def plan_blocks(codes, sizes, limit):
+    blocks, block, used = [], [], 0
+    for code in codes:
+        if block and used + sizes[code] > limit:
+            blocks.append(block)
+            block, used = [], 0
+        block.append(code)
+        used += sizes[code]
+    if block:
+        blocks.append(block)
+    return blocks
+
+
+#Largest block in spooled bytes: every worker's block has to fit its share of --memory-budget,
+#and with several workers the suite is cut into BLOCKS_PER_WORKER blocks per worker so they stay busy
+def block_limit(total_bytes, options):
+    limits = [math.inf]
+    if options.memory_budget:
+        limits.append(options.memory_budget * 1e6 / MEMORY_PER_SPOOL_BYTE / options.reshape_workers)
+    if options.reshape_workers > 1:
+        limits.append(total_bytes / (BLOCKS_PER_WORKER * options.reshape_workers))
+    return min(limits)
+
+
+#Frame of the spooled rows of some codes, with the client-side filter applied
+def load_block(checkpoints, codes, options):
+    df = stream.build_frame([(code, checkpoints.load(code)) for code in codes])
+    if not df.empty:
+        df = odata.filter_rows(df, options)
+    return df
+
+
+def clean_block(topic, df, options):
+    clean = clean_rows(topic, df)
+    if options.float32:
+        clean["NumericValue"] = clean["NumericValue"].astype("float32")
+    return clean
+
+
+#Header line of a topic's long CSV
+def long_header(topic):
+    columns = clean_rows(topic, pd.DataFrame(columns=NEEDED_COLS)).columns
+    return ",".join(quote(name) for name in columns) + os.linesep
+
+
+#Writes the long rows of one block, without a header, to out_path. Returns whether the block had
+#rows, the places with at least one value and the delta states of its indicators
+def write_long_block(topic, codes, checkpoints, options, out_path):
+    df = load_block(checkpoints, codes, options)
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        if df.empty:
+            return False, set(), {}
+        clean = clean_block(topic, df, options)
+        clean.to_csv(f, index=False, header=False, lineterminator=os.linesep)
+    places = set(clean.loc[clean["NumericValue"].notna(), topic.spatial_column].unique())
+    return True, places, delta.indicator_states(df, options.float32)
+
+
+#Writes the columns of one block of the wide CSV, for every place of the table and header lines
+#included, to out_path. Returns False when the block has no value at all
+def write_wide_block(topic, codes, checkpoints, places, options, out_path):
+    df = load_block(checkpoints, codes, options)
+    if df.empty:
+        return False
+    clean = clean_block(topic, df, options)
+    cells, vals, row_index, col_index = pivot_keys(clean, topic.spatial_column, ["IndicatorCode", "YEAR"], "NumericValue")
+    if not len(col_index):
+        return False
+
+    #Rows of the block renumbered into the rows of the whole table
+    width = len(col_index)
+    rows = np.searchsorted(places, np.asarray(row_index, dtype=object))
+    wide = sparse_wide(rows[cells // width] * width + cells % width, vals, places, col_index)
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        for level in range(col_index.nlevels):
+            f.write("".join("," + quote(label) for label in col_index.get_level_values(level)) + "\n")
+        f.write("," * width + "\n")
+        for _, fields in wide.row_fields():
+            f.write("," + ",".join(fields) + "\n")
+    return True
+
+
+#Joins block files line by line, at most MAX_OPEN_BLOCKS at a time, into one block file
+def stitch(paths, folder):
+    while len(paths) > MAX_OPEN_BLOCKS:
+        merged = []
+        for start in range(0, len(paths), MAX_OPEN_BLOCKS):
+            path = os.path.join(folder, f"merged_{len(merged):05d}_{len(paths)}.txt")
+            join_lines(paths[start:start + MAX_OPEN_BLOCKS], path)
+            merged.append(path)
+        paths = merged
+    return paths
+
+
+#Writes every line of the block files side by side, after the line's label when labels are given
+def join_lines(paths, out_path, labels=None, newline="\n"):
+    files = [open(path, encoding="utf-8") for path in paths]
+    try:
+        with open(out_path, "w", newline="", encoding="utf-8") as out:
+            lines = iter(labels or [])
+            for parts in zip(*files):
+                label = next(lines, "")
+                out.write(label + "".join(part.rstrip("\n") for part in parts) + newline)
+    finally:
+        for f in files:
+            f.close()
+
+
+#Runs fn over the argument tuples, in spawned worker processes when there are several workers
+#(the fetch threads make fork unsafe); the results always come back in the order of the arguments
+def map_blocks(pool, fn, args):
+    if pool is None:
+        return [fn(*a) for a in args]
+    return list(pool.map(fn, *zip(*args))) if args else []
+
+
+#Same as run_topics, built from the spool block by block instead of from one frame in memory.
+#Every indicator is spooled to disk as it arrives. Then the long CSV of every topic is written
+#in blocks of indicators in the topic's order, and its wide CSV in column blocks in the sorted
+#order of the codes, each block to its own file, which are then joined in block order. With
+#--memory-budget a block holds no more rows than fit in the budget; with --reshape-workers the
+#blocks of every topic are shared out over a process pool. Either way the files are the same
+#as the ones run_topics writes
+def run_topics_in_blocks(topics, options=None):
+    options = options or FetchOptions()
+    if options.delta:
+        print("--delta applies to single topic runs, the suite fetches every indicator in full")
+        options.delta = False
+
+    topic_codes, union = match_topics(topics, options)
+
+    start = time.perf_counter()
+    report = FetchReport()
+    checkpoints = fetch_to_spool(union, "suite", options, report, columns=NEEDED_COLS)
+    print(f" Suite fetch took {time.perf_counter() - start:.2f}s")
+
+    sizes = {code: os.path.getsize(checkpoints.frame_path(code)) for code in union
+             if os.path.exists(checkpoints.frame_path(code))}
+    limit = block_limit(sum(sizes.values()), options)
+    folder = tempfile.mkdtemp(prefix="blocks_", dir=checkpoints.path)
+    pool = None
+    if options.reshape_workers > 1:
+        pool = ProcessPoolExecutor(max_workers=options.reshape_workers, mp_context=get_context("spawn"))
+
+    try:
+        start = time.perf_counter()
+        plans = {}
+        for topic in topics:
+            codes = [code for code in topic_codes[topic.name] if code in sizes]
+            if not codes:
+                print(f"\n No data collected for {topic.name}, skipping it")
+                continue
+            plans[topic.name] = (topic, plan_blocks(codes, sizes, limit), plan_blocks(sorted(codes), sizes, limit))
+            print(f"\n Building {topic.name} outputs from {len(codes)} indicators in {len(plans[topic.name][1])} blocks "
+                  f"({sum(sizes[code] for code in codes) / 1e6:.1f} MB spooled)")
+
+        #Long CSVs: the blocks of every topic at once, then each topic's parts joined in order
+        units = [(topic, block, checkpoints, options, os.path.join(folder, f"{topic.name}_long_{i:05d}.csv"))
+                 for topic, long_blocks, _ in plans.values() for i, block in enumerate(long_blocks)]
+        results = map_blocks(pool, write_long_block, units)
+
+        tables = {}
+        for name, (topic, _, _) in plans.items():
+            parts = [(u[4], result) for u, result in zip(units, results) if u[0].name == name]
+            if not any(has_rows for _, (has_rows, _, _) in parts):
+                print(f"\n No rows left for {name} after the filters, skipping it")
+                continue
+
+            places, states = set(), {}
+            with open(topic.long_path, "w", newline="", encoding="utf-8") as out:
+                out.write(long_header(topic))
+                for path, (_, block_places, block_states) in parts:
+                    with open(path, encoding="utf-8", newline="") as f:
+                        shutil.copyfileobj(f, out)
+                    places.update(block_places)
+                    states.update(block_states)
+            tables[name] = (np.array(sorted(places), dtype=object), states)
+
+        #Wide CSVs: the column blocks of every topic at once, then each topic's blocks side by side
+        units = [(plans[name][0], block, checkpoints, places, options, os.path.join(folder, f"{name}_wide_{i:05d}.txt"))
+                 for name, (places, _) in tables.items() for i, block in enumerate(plans[name][2])]
+        written = map_blocks(pool, write_wide_block, units)
+
+        for name, (places, states) in tables.items():
+            topic = plans[name][0]
+            paths = [u[5] for u, ok in zip(units, written) if ok and u[0].name == name]
+            if not paths:
+                empty = clean_rows(topic, pd.DataFrame(columns=NEEDED_COLS))
+                pivot_wide(empty, index=topic.spatial_column, columns=["IndicatorCode", "YEAR"],
+                           values="NumericValue").to_csv(topic.wide_path)
+            else:
+                labels = ["IndicatorCode", "YEAR", topic.spatial_column] + list(places)
+                join_lines(stitch(paths, folder), topic.wide_path, [quote(label) for label in labels], os.linesep)
+
+            print(f"Saved {topic.folder}/{topic.long_csv} and {topic.folder}/{topic.wide_csv}")
+            delta.remember_state(topic.long_path, None, options, indicators=states)
+            delta.save_delta_state(topic.long_path)
+        print(f" Reshaped {len(tables)} topics in {time.perf_counter() - start:.2f}s "
+              f"with {options.reshape_workers} worker{'s' if options.reshape_workers > 1 else ''}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        shutil.rmtree(folder, ignore_errors=True)
+
+    spool.clear_spool("suite", options)
+    return report
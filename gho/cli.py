@@ -0,0 +1,133 @@
+import argparse
+
+from .options import (
+    DEFAULT_BACKOFF,
+    DEFAULT_BREAKER_COOLDOWN,
+    DEFAULT_BREAKER_THRESHOLD,
+    DEFAULT_CATALOG_TTL_HOURS,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_MAX_BACKOFF,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_RECHECK_EMPTY_HOURS,
+    DEFAULT_RETRIES,
+    DEFAULT_WORKERS,
+    FetchOptions,
+)
+
+
+#Builds the command line shared by every topic script
+def build_parser(description=None):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"number of indicator codes fetched concurrently (default {DEFAULT_WORKERS})")
+    parser.add_argument("--timings", dest="timings_path", default=None,
+                        help="write the per-request timings of the run to this CSV file")
+    parser.add_argument("--cache-dir", default=None,
+                        help="folder for the shared on-disk caches (default .gho_cache at the repository root)")
+    parser.add_argument("--catalog-ttl", type=float, default=DEFAULT_CATALOG_TTL_HOURS,
+                        help=f"hours the cached indicator catalog stays fresh (default {DEFAULT_CATALOG_TTL_HOURS})")
+    parser.add_argument("--refresh-catalog", action="store_true",
+                        help="ignore the cached indicator catalog and fetch it again")
+    parser.add_argument("--connect-timeout", type=float, default=DEFAULT_CONNECT_TIMEOUT,
+                        help=f"seconds to wait for a connection to the API (default {DEFAULT_CONNECT_TIMEOUT})")
+    parser.add_argument("--read-timeout", type=float, default=DEFAULT_READ_TIMEOUT,
+                        help=f"seconds to wait for the API to answer a request (default {DEFAULT_READ_TIMEOUT})")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help=f"retries of a request that failed with 429, 5xx or a connection error (default {DEFAULT_RETRIES})")
+    parser.add_argument("--backoff", type=float, default=DEFAULT_BACKOFF,
+                        help=f"base delay in seconds of the jittered exponential backoff (default {DEFAULT_BACKOFF})")
+    parser.add_argument("--max-backoff", type=float, default=DEFAULT_MAX_BACKOFF,
+                        help=f"longest delay in seconds between two retries (default {DEFAULT_MAX_BACKOFF})")
+    parser.add_argument("--breaker-threshold", type=int, default=DEFAULT_BREAKER_THRESHOLD,
+                        help=f"failures in a row that pause every worker (default {DEFAULT_BREAKER_THRESHOLD})")
+    parser.add_argument("--breaker-cooldown", type=float, default=DEFAULT_BREAKER_COOLDOWN,
+                        help=f"seconds every worker pauses once the breaker opens (default {DEFAULT_BREAKER_COOLDOWN})")
+    parser.add_argument("--no-select", dest="select", action="store_false",
+                        help="download every field of every row instead of only the columns the outputs use")
+    parser.add_argument("--since", type=int, default=None,
+                        help="only fetch observations from this year onwards")
+    parser.add_argument("--until", type=int, default=None,
+                        help="only fetch observations up to and including this year")
+    parser.add_argument("--countries", default=None,
+                        help="comma separated ISO3 codes to fetch, e.g. KEN,UGA (default every country and region)")
+    parser.add_argument("--delta", action="store_true",
+                        help="only fetch periods from the last run onwards and merge them into the existing long CSV")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip the indicators an interrupted run already fetched and reuse their checkpoints")
+    parser.add_argument("--recheck-empty", type=float, default=DEFAULT_RECHECK_EMPTY_HOURS,
+                        help="hours an indicator that returned no data is skipped before it is fetched again, "
+                             f"0 fetches every indicator (default {DEFAULT_RECHECK_EMPTY_HOURS})")
+    parser.add_argument("--compact", action="store_true",
+                        help="keep the long data in compact dtypes (categorical countries and codes, int16 years)")
+    parser.add_argument("--float32", action="store_true",
+                        help="with --compact, also store the values as float32 (implies --compact)")
+    parser.add_argument("--sparse", action="store_true",
+                        help="hold the wide table in sparse form, so it takes memory for its values only")
+    parser.add_argument("--cube", action="store_true",
+                        help="also fetch Dim1/Dim2/Dim3 and save every row, by sex, age and the other breakdowns, "
+                             "to a sparse observation cube next to the long CSV")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record", default=None, metavar="FOLDER",
+                          help="save every API response of the run to a cassette in this folder")
+    cassette.add_argument("--replay", default=None, metavar="FOLDER",
+                          help="answer every request from the cassette in this folder, without using the network")
+    return parser
+
+
+#Splits "KEN, uga" into ["KEN", "UGA"]
+def parse_countries(value):
+    if not value:
+        return None
+
+    countries = [c.strip().upper() for c in value.split(",") if c.strip()]
+    bad = [c for c in countries if not c.replace("_", "").isalnum()]
+    if bad:
+        raise SystemExit(f"--countries expects comma separated codes such as KEN,UGA, got {bad}")
+    return countries
+
+
+#Turns the parsed command line into FetchOptions
+def options_from_args(args):
+    if args.workers < 1:
+        raise SystemExit("--workers must be at least 1")
+    if args.retries < 0 or args.breaker_threshold < 1:
+        raise SystemExit("--retries must not be negative and --breaker-threshold must be at least 1")
+    if args.since is not None and args.until is not None and args.since > args.until:
+        raise SystemExit("--since must not be later than --until")
+    if args.recheck_empty < 0:
+        raise SystemExit("--recheck-empty must not be negative")
+    if args.cube and args.delta:
+        raise SystemExit("--cube needs every row with its breakdowns, which --delta does not fetch again")
+
+    return FetchOptions(
+        workers=args.workers,
+        timings_path=args.timings_path,
+        cache_dir=args.cache_dir,
+        catalog_ttl=args.catalog_ttl,
+        refresh_catalog=args.refresh_catalog,
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        select=args.select,
+        since=args.since,
+        until=args.until,
+        countries=parse_countries(args.countries),
+        delta=args.delta,
+        resume=args.resume,
+        retries=args.retries,
+        backoff=args.backoff,
+        max_backoff=args.max_backoff,
+        breaker_threshold=args.breaker_threshold,
+        breaker_cooldown=args.breaker_cooldown,
+        recheck_empty=args.recheck_empty,
+        compact=args.compact or args.float32,
+        float32=args.float32,
+        cube=args.cube,
+        sparse=args.sparse,
+        record=args.record,
+        replay=args.replay,
+    )
+
+
+def parse_args(description=None, argv=None):
+    args = build_parser(description).parse_args(argv)
+    return options_from_args(args)
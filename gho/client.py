@@ -0,0 +1,185 @@
+import email.utils
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cassette import get_cassette
+from .options import FetchOptions
+
+
+#The GHO_API_URL environment variable points every script at another server, such as the local stand-in
+GHO_API_URL = os.environ.get("GHO_API_URL", "https://ghoapi.azureedge.net/api").rstrip("/")
+
+
+#Answers worth trying again: rate limiting and temporary server trouble
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+#Sessions shared by every fetch in the process, one per worker count
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+#Builds a session whose connection pool holds pool_size keep-alive connections
+def build_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip, deflate"})
+    return session
+
+
+def get_session(options=None):
+    options = options or FetchOptions()
+    with _sessions_lock:
+        #Each worker may hold the page it is decoding while the next page is prefetched
+        if options.workers not in _sessions:
+            _sessions[options.workers] = build_session(2 * options.workers)
+        return _sessions[options.workers]
+
+
+#Stops every worker for a while once the API keeps failing, instead of hammering a degraded endpoint
+class CircuitBreaker:
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0
+        self.times_opened = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    #Blocks while the breaker is open; every worker calls this before sending a request
+    def wait(self):
+        while True:
+            with self._lock:
+                delay = self.open_until - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+
+    #After the cooldown one more failure is enough to open the breaker again
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold and time.monotonic() >= self.open_until:
+                self.open_until = time.monotonic() + self.cooldown
+                self.times_opened += 1
+                print(f"  -> API failed {self.failures} times in a row, pausing all workers for {self.cooldown}s")
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+
+_breaker = None
+
+
+def get_breaker(options=None):
+    global _breaker
+    options = options or FetchOptions()
+    with _sessions_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(options.breaker_threshold, options.breaker_cooldown)
+        return _breaker
+
+
+#Seconds asked for by a Retry-After header (a number of seconds or an HTTP date), or None
+def retry_after(resp):
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - time.time(), 0)
+
+
+#Exponential backoff with full jitter, so retrying workers do not all come back at once
+def backoff(attempt, options):
+    return random.uniform(0, min(options.max_backoff, options.backoff * 2 ** attempt))
+
+
+#GET through the shared session with connect and read timeouts, so a stalled request cannot hang a run
+#Connection errors, timeouts and RETRY_STATUSES are retried up to options.retries times; after that the
+#last response is returned (or the last error raised) for the caller to handle
+#With --replay the response comes from the cassette instead, and with --record it is saved to it
+def get(url, options=None, **kwargs):
+    options = options or FetchOptions()
+    cassette = get_cassette(options)
+    if cassette is not None and cassette.mode == "replay":
+        return cassette.replay(url, kwargs.get("params"))
+
+    session = get_session(options)
+    breaker = get_breaker(options)
+    timeout = (options.connect_timeout, options.read_timeout)
+
+    attempt = 0
+    while True:
+        breaker.wait()
+        try:
+            resp = session.get(url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            breaker.record_failure()
+            if attempt >= options.retries:
+                raise
+            delay = backoff(attempt, options)
+            print(f"  -> {type(e).__name__} for {url}, retrying in {delay:.1f}s")
+        else:
+            if resp.status_code not in RETRY_STATUSES:
+                breaker.record_success()
+                return cassette.record(url, kwargs.get("params"), resp) if cassette else resp
+
+            breaker.record_failure()
+            if attempt >= options.retries:
+                return cassette.record(url, kwargs.get("params"), resp) if cassette else resp
+            delay = retry_after(resp)
+            delay = min(delay, options.max_backoff) if delay is not None else backoff(attempt, options)
+            resp.close()
+            print(f"  -> status {resp.status_code} for {url}, retrying in {delay:.1f}s")
+
+        breaker.record_retry()
+        attempt += 1
+        time.sleep(delay)
+
+
+#Counts the connections opened and the requests sent through the session's pools
+def connection_stats(session):
+    opened = sent = 0
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            sent += pool.num_requests
+
+    return {"connections": opened, "requests": sent, "reused": max(sent - opened, 0)}
+
+
+def print_connection_stats(options=None):
+    stats = connection_stats(get_session(options))
+    if stats["requests"]:
+        print(f" HTTP: {stats['requests']} requests over {stats['connections']} connections "
+              f"({stats['reused']} reused a kept-alive connection)")
+
+    breaker = get_breaker(options)
+    if breaker.retries or breaker.times_opened:
+        print(f" HTTP: {breaker.retries} retries, circuit breaker opened {breaker.times_opened} times")
+
+    cassette = get_cassette(options)
+    if cassette is not None:
+        print(cassette.summary())
@@ -0,0 +1,48 @@
+import pandas as pd
+
+
+#Smallest integer type every GHO year fits in
+YEAR_DTYPE = "int16"
+
+
+def frame_mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+#Dtypes of a compact long frame: the place and indicator columns become categoricals (one small
+#integer per row pointing at each distinct string once), YEAR int16 and, with float32, NumericValue float32
+def compact_dtypes(columns, float32=False):
+    spatial = columns[0]
+    dtypes = {spatial: "category", "IndicatorCode": "category", "YEAR": YEAR_DTYPE}
+    if float32:
+        dtypes["NumericValue"] = "float32"
+    return {name: dtype for name, dtype in dtypes.items() if name in columns}
+
+
+#Converts the long frame of clean_and_reshape to compact dtypes when --compact is on and prints
+#how much memory that saved; the saved CSV holds the same text (float32 values are written in
+#their shortest float32 form)
+def compact_long(clean, options=None):
+    if options is None or not options.compact:
+        return clean
+
+    before = frame_mb(clean)
+    clean = clean.astype(compact_dtypes(list(clean.columns), options.float32))
+    #Sorted categories, as read_csv makes them, so the frame read back from the CSV is equal to this one
+    for name in clean.columns:
+        if isinstance(clean[name].dtype, pd.CategoricalDtype):
+            observed = clean[name].cat.remove_unused_categories()
+            clean[name] = observed.cat.reorder_categories(sorted(observed.cat.categories))
+
+    after = frame_mb(clean)
+    saved = 100 * (1 - after / before) if before else 0
+    print(f"\n Compact long data: {before:.2f} MB -> {after:.2f} MB ({saved:.0f}% smaller)")
+    return clean
+
+
+#Reads a long CSV written by a topic back into the same compact dtypes, with the values parsed round
+#trip (the default parser can be one ulp off) and only empty values missing (so Namibia stays NA)
+def read_long_csv(path, float32=False):
+    columns = list(pd.read_csv(path, nrows=0).columns)
+    return pd.read_csv(path, dtype=compact_dtypes(columns, float32), keep_default_na=False,
+                       na_values={"NumericValue": [""]}, float_precision="round_trip")
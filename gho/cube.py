@@ -0,0 +1,241 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from .compact import frame_mb
+from .reshape import cell_means, cell_sums, pivot_wide, sorted_factorize
+
+
+#Axes of the cube, under their GHO names: the place, the indicator, the year and the three
+#breakdowns GHO rows carry (sex, age group, income, residence area and so on)
+AXES = ["SpatialDim", "IndicatorCode", "TimeDim", "Dim1", "Dim2", "Dim3"]
+DIMS = ["Dim1", "Dim2", "Dim3"]
+
+#Label of a breakdown a row does not have (GHO leaves that Dim null)
+NO_DIM = ""
+
+AGGREGATIONS = ["mean", "sum", "min", "max", "count", "first", "last"]
+
+
+#Columns to download for a run: with --cube the breakdowns are fetched as well
+def cube_columns(columns, options):
+    if not columns or not options.cube:
+        return columns
+    return list(dict.fromkeys(list(columns) + DIMS))
+
+
+#File the cube of a topic is saved to, next to its long CSV: x_long.csv -> x_cube.npz
+def cube_path(long_csv):
+    stem = os.path.splitext(long_csv)[0]
+    if stem.endswith("_long"):
+        stem = stem[:-len("_long")]
+    return f"{stem}_cube.npz"
+
+
+#Labels as a plain numpy array, so they can be saved without pickling
+def plain_labels(labels):
+    labels = np.asarray(labels)
+    return labels.astype(str) if labels.dtype == object else labels
+
+
+#Sparse observation cube: only the cells that hold a value are stored, as one row of integer
+#coordinates (one per axis, pointing into that axis' sorted labels) plus the value. The rows are
+#kept in the lexicographic order of their coordinates, every cell at most once
+class ObservationCube:
+    def __init__(self, axes, labels, coords, values):
+        self.axes = list(axes)
+        self.labels = {axis: plain_labels(labels[axis]) for axis in self.axes}
+        self.coords = coords
+        self.values = values
+
+    #Builds the cube of a frame of GHO rows (SpatialDim, IndicatorCode, TimeDim, NumericValue and
+    #whichever of Dim1, Dim2, Dim3 were downloaded). Rows without a value, place, indicator or year
+    #are left out; rows repeating a cell exactly, breakdowns included, are averaged and counted in
+    #duplicates
+    @classmethod
+    def from_frame(cls, df, axes=AXES):
+        axes = [axis for axis in axes if axis in df.columns or axis in DIMS]
+        vals = pd.to_numeric(df["NumericValue"], errors="coerce").to_numpy(dtype="float64")
+        keep = ~np.isnan(vals)
+
+        labels, codes = {}, []
+        for axis in axes:
+            if axis not in df.columns:
+                column = pd.Series(NO_DIM, index=df.index)
+            elif axis in DIMS:
+                column = df[axis].astype(object).where(df[axis].notna(), NO_DIM).astype(str)
+            elif axis == "TimeDim":
+                column = pd.to_numeric(df[axis], errors="coerce").to_numpy(dtype="float64")
+            else:
+                column = df[axis]
+            axis_codes, axis_labels = sorted_factorize(column)
+            keep &= axis_codes >= 0
+            labels[axis] = np.asarray(axis_labels).astype("int64") if axis == "TimeDim" else np.asarray(axis_labels)
+            codes.append(axis_codes)
+
+        coords = np.stack(codes, axis=1)[keep].astype("int32")
+        cube = cls(axes, labels, coords, vals[keep])
+        cube.duplicates = cube.collapse()
+        return cube.prune()
+
+    #Sizes of the axes, as a dense array would have them
+    @property
+    def shape(self):
+        return tuple(len(self.labels[axis]) for axis in self.axes)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        return self.coords.nbytes + self.values.nbytes + sum(labels.nbytes for labels in self.labels.values())
+
+    #Share of the cells of the dense array that hold a value
+    @property
+    def density(self):
+        cells = float(np.prod(self.shape, dtype="float64"))
+        return len(self) / cells if cells else 0.0
+
+    #One int64 per row, in the lexicographic order of the coordinates of the axes given
+    def flat_keys(self, axes):
+        key = np.zeros(len(self), dtype="int64")
+        for axis in axes:
+            key *= len(self.labels[axis])
+            key += self.coords[:, self.axes.index(axis)]
+        return key
+
+    #Sorts the rows by their coordinates and averages the rows that share a cell, returns how many went
+    def collapse(self):
+        key = self.flat_keys(self.axes)
+        order = np.argsort(key, kind="stable")
+        key, self.coords, self.values = key[order], self.coords[order], self.values[order]
+        first = np.ones(len(key), dtype=bool)
+        first[1:] = key[1:] != key[:-1]
+        if first.all():
+            return 0
+
+        cells = np.cumsum(first) - 1
+        where, means = cell_means(cells, self.values, np.bincount(cells))
+        self.coords, self.values = self.coords[first], means
+        return int(len(first) - first.sum())
+
+    #Drops the labels no row points at any more and renumbers the coordinates
+    def prune(self):
+        for i, axis in enumerate(self.axes):
+            used, positions = np.unique(self.coords[:, i], return_inverse=True)
+            if len(used) < len(self.labels[axis]):
+                self.labels[axis] = self.labels[axis][used]
+                self.coords[:, i] = positions
+        return self
+
+    #Integer codes of some labels of an axis; labels the axis does not have are ignored
+    def label_codes(self, axis, wanted):
+        wanted = [wanted] if isinstance(wanted, str) or np.ndim(wanted) == 0 else list(wanted)
+        labels = self.labels[axis]
+        wanted = np.asarray(wanted).astype(labels.dtype if labels.dtype.kind in "iuf" else str)
+        return np.flatnonzero(np.isin(labels, wanted))
+
+    #Cube of the rows whose labels are among the ones given for each axis, for example
+    #cube.select(IndicatorCode="WHOSIS_000001", Dim1=["SEX_MLE", "SEX_FMLE"], TimeDim=range(2010, 2020))
+    def select(self, **criteria):
+        unknown = [axis for axis in criteria if axis not in self.axes]
+        if unknown:
+            raise KeyError(f"The cube has no axis {unknown}, its axes are {self.axes}")
+
+        mask = np.ones(len(self), dtype=bool)
+        for axis, wanted in criteria.items():
+            mask &= np.isin(self.coords[:, self.axes.index(axis)], self.label_codes(axis, wanted))
+
+        labels = {axis: self.labels[axis] for axis in self.axes}
+        return ObservationCube(self.axes, labels, self.coords[mask], self.values[mask]).prune()
+
+    #Reduces the axes in over with one of AGGREGATIONS and returns the cube of the remaining axes.
+    #mean and sum add the rows of a cell in coordinate order with Kahan compensation; first and
+    #last take the row with the lowest or highest labels on the reduced axes
+    def aggregate(self, over, how="mean"):
+        over = [over] if isinstance(over, str) else list(over)
+        unknown = [axis for axis in over if axis not in self.axes]
+        if unknown:
+            raise KeyError(f"The cube has no axis {unknown}, its axes are {self.axes}")
+        if how not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation {how!r}, expected one of {AGGREGATIONS}")
+
+        kept = [axis for axis in self.axes if axis not in over]
+        key = self.flat_keys(kept)
+        order = np.argsort(key, kind="stable")
+        key, values = key[order], self.values[order]
+        first = np.ones(len(key), dtype=bool)
+        first[1:] = key[1:] != key[:-1]
+        starts = np.flatnonzero(first)
+        cells = np.cumsum(first) - 1
+        counts = np.bincount(cells) if len(cells) else np.zeros(0, dtype="int64")
+
+        if how == "mean":
+            result = cell_means(cells, values, counts)[1] if len(cells) else values
+        elif how == "sum":
+            result = cell_sums(cells, values, counts)[1] if len(cells) else values
+        elif how == "min":
+            result = np.minimum.reduceat(values, starts) if len(starts) else values
+        elif how == "max":
+            result = np.maximum.reduceat(values, starts) if len(starts) else values
+        elif how == "count":
+            result = counts.astype("float64")
+        elif how == "first":
+            result = values[starts]
+        else:
+            result = values[np.append(starts[1:], len(values)) - 1] if len(starts) else values
+
+        coords = self.coords[order][starts][:, [self.axes.index(axis) for axis in kept]]
+        labels = {axis: self.labels[axis] for axis in kept}
+        return ObservationCube(kept, labels, coords, result).prune()
+
+    #Long frame with one column per axis and NumericValue
+    def to_frame(self):
+        data = {axis: self.labels[axis][self.coords[:, i]] for i, axis in enumerate(self.axes)}
+        data["NumericValue"] = self.values
+        return pd.DataFrame(data)
+
+    #Wide table of index x columns, the other axes reduced explicitly with how. With the defaults
+    #and how="mean" it holds the values of the wide CSV of the topic, up to the last bit (the cube adds
+    #the breakdowns of a cell in label order, the scripts in the order the API sent them)
+    def to_wide(self, index="SpatialDim", columns=("IndicatorCode", "TimeDim"), how="mean"):
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        over = [axis for axis in self.axes if axis != index and axis not in columns]
+        reduced = self.aggregate(over, how) if over else self
+        return pivot_wide(reduced.to_frame(), index=index, columns=columns, values="NumericValue")
+
+    def save(self, path):
+        arrays = {f"labels_{axis}": self.labels[axis] for axis in self.axes}
+        np.savez_compressed(path, axes=np.array(self.axes), coords=self.coords, values=self.values, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            axes = [str(axis) for axis in data["axes"]]
+            labels = {axis: data[f"labels_{axis}"] for axis in axes}
+            return cls(axes, labels, data["coords"], data["values"])
+
+    def summary(self):
+        sizes = " x ".join(f"{len(self.labels[axis])} {axis}" for axis in self.axes)
+        return f"{len(self):,} observations in {sizes} ({100 * self.density:.4f}% filled, {self.nbytes / 1e6:.2f} MB)"
+
+
+#With --cube, saves the rows of a topic, breakdowns included, next to its long CSV
+def save_cube(df, long_csv, options=None):
+    if options is None or not options.cube or df.empty:
+        return None
+
+    cube = ObservationCube.from_frame(df)
+    path = cube_path(long_csv)
+    cube.save(path)
+    print(f"\n Observation cube: {cube.summary()}")
+    if cube.duplicates:
+        print(f" {cube.duplicates} rows repeated a cell of another row exactly and were averaged into it")
+    print(f" Saved {os.path.basename(path)} (the same rows take {frame_mb(df):.2f} MB as a frame)")
+    return cube
+
+
+#Reads a cube saved by save_cube
+def load_cube(path):
+    return ObservationCube.load(path)
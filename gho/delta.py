@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .catalog import write_json_atomic
+
+
+#State waiting for its outputs to be saved, keyed by the long CSV it describes
+_pending = {}
+
+
+#The state of a topic lives next to its long CSV file
+def state_path(long_csv):
+    return f"{long_csv}.state.json"
+
+
+#The filters a run was made with; a delta only makes sense against a run with the same filters
+def filter_signature(options):
+    return {
+        "since": options.since,
+        "until": options.until,
+        "countries": sorted(options.countries) if options.countries else None,
+    }
+
+
+def load_state(long_csv):
+    path = state_path(long_csv)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print("Delta state", path, "is unreadable, doing a full refresh")
+        return None
+
+
+#Hash of a set of rows that does not depend on their order or on how they were read
+#With float32 the values are hashed as the float32 numbers the long CSV holds, so the rows read back
+#from a --float32 CSV hash the same as the rows that were fetched
+def rows_hash(df, float32=False):
+    values = pd.to_numeric(df["NumericValue"], errors="coerce").astype(float)
+    if float32:
+        values = values.astype("float32").astype(float)
+    canonical = pd.DataFrame({
+        "SpatialDim": df["SpatialDim"].astype(str),
+        "TimeDim": df["TimeDim"].astype(int),
+        "IndicatorCode": df["IndicatorCode"].astype(str),
+        "NumericValue": values,
+    })
+    canonical = canonical.sort_values(list(canonical.columns)).reset_index(drop=True)
+    return hashlib.sha256(pd.util.hash_pandas_object(canonical, index=False).values.tobytes()).hexdigest()
+
+
+#Reads the previous long CSV back under the GHO column names (its columns follow the order of NEEDED_COLS)
+#The values are parsed round trip so they hash the same as when they were fetched, and the keys stay
+#strings (Namibia's code NA would otherwise be read as a missing value)
+def read_previous_rows(long_csv, columns):
+    header = list(pd.read_csv(long_csv, nrows=0).columns)
+    if len(header) != len(columns):
+        return None
+
+    names = dict(zip(columns, header))
+    dtype = {names[c]: str for c in ("SpatialDim", "IndicatorCode") if c in names}
+    na_values = {names[c]: [""] for c in columns if c not in ("SpatialDim", "IndicatorCode")}
+    previous = pd.read_csv(long_csv, dtype=dtype, keep_default_na=False, na_values=na_values,
+                           float_precision="round_trip")
+    previous.columns = columns
+    return previous
+
+
+#Only the rows that end up in the long CSV count towards the state
+def kept_rows(df):
+    return df.dropna(subset=["SpatialDim", "TimeDim", "IndicatorCode"])
+
+
+#Works out, for every code, the first period to fetch again (None means the whole history)
+#Returns the periods and the previous rows, or (None, None) when a full refresh is needed
+def plan_delta(codes, long_csv, options, columns):
+    state = load_state(long_csv)
+    if state is None or not os.path.exists(long_csv):
+        print("No previous run of", long_csv, "found, doing a full refresh")
+        return None, None
+    if state.get("filters") != filter_signature(options):
+        print("Filters differ from the previous run of", long_csv + ", doing a full refresh")
+        return None, None
+
+    previous = read_previous_rows(long_csv, columns)
+    if previous is None:
+        print("Columns of", long_csv, "do not match NEEDED_COLS, doing a full refresh")
+        return None, None
+
+    #The last period is fetched again too, because the latest year is the one that gets revised
+    #Codes that are new, or whose rows in the CSV no longer match the recorded hash, are fetched in full
+    since_by_code = {}
+    full = 0
+    by_code = dict(tuple(previous.groupby("IndicatorCode", sort=False)))
+    for code in codes:
+        seen = state["indicators"].get(code)
+        rows = by_code.get(code)
+        if seen is None or rows is None or rows_hash(rows, options.float32) != seen["hash"]:
+            since_by_code[code] = options.since
+            full += 1
+        else:
+            since_by_code[code] = max(seen["max_time"], options.since or seen["max_time"])
+
+    print(f"\n Delta refresh: {len(codes) - full} indicators fetched from their last period, "
+          f"{full} fetched in full")
+    return since_by_code, previous
+
+
+#Indicator, place and period of every row, numbered when several rows share them (one per sex and so on)
+def row_keys(df):
+    keys = pd.DataFrame({
+        "IndicatorCode": df["IndicatorCode"].astype(str).to_numpy(),
+        "SpatialDim": df["SpatialDim"].astype(str).to_numpy(),
+        "TimeDim": pd.to_numeric(df["TimeDim"], errors="coerce").to_numpy(dtype="float64"),
+    })
+    keys["nth"] = keys.groupby(list(keys.columns), dropna=False, sort=False).cumcount()
+    return pd.MultiIndex.from_frame(keys)
+
+
+#Replaces the refetched periods of the previous rows with the freshly fetched ones
+#codes are all the codes of the topic in order; the ones in kept_codes (failed to fetch, or skipped
+#as known to be empty) keep their previous rows, and codes no longer searched for are dropped
+#The rows are put back in the order a full fetch returns them: a refetched row takes the place of
+#the row it replaces, a row that is new since the last run follows the refetched row before it, and
+#a code fetched in full keeps the order it was fetched in
+def merge_delta(previous, fetched, codes, since_by_code, kept_codes):
+    previous = previous[previous["IndicatorCode"].isin(codes)].reset_index(drop=True)
+
+    since = previous["IndicatorCode"].map(since_by_code)
+    replaced = since.isna() | (previous["TimeDim"] >= since.fillna(0))
+    replaced &= ~previous["IndicatorCode"].isin(kept_codes)
+    kept = previous[~replaced]
+    places = np.flatnonzero(~replaced).astype("float64")
+
+    if not fetched.empty:
+        fetched = fetched.reset_index(drop=True)
+        slots = pd.Series(np.flatnonzero(replaced).astype("float64"), index=row_keys(previous[replaced]))
+        fetched_places = slots.reindex(row_keys(fetched)).to_numpy(copy=True)
+        fetched_codes = fetched["IndicatorCode"].astype(str)
+        in_full = fetched_codes.map(since_by_code).isna().to_numpy()
+        fetched_places[in_full] = np.arange(len(fetched))[in_full]
+        fetched_places = pd.Series(fetched_places).groupby(fetched_codes.to_numpy()).ffill().fillna(-1).to_numpy()
+        kept = pd.concat([kept, fetched], ignore_index=True)
+        places = np.concatenate([places, fetched_places])
+
+    #Grouped by indicator in the order of the codes, like a full fetch, then by place; a new row
+    #comes after the refetched row it follows
+    order = kept["IndicatorCode"].astype(str).map({code: i for i, code in enumerate(codes)}).to_numpy()
+    return kept.iloc[np.lexsort((np.arange(len(kept)), places, order))].reset_index(drop=True)
+
+
+#Max TimeDim, row count and row hash of every indicator in df
+def indicator_states(df, float32=False):
+    indicators = {}
+    rows = kept_rows(df)
+    if not rows.empty:
+        for code, rows_i in rows.groupby("IndicatorCode", sort=False):
+            indicators[code] = {"max_time": int(rows_i["TimeDim"].max()), "rows": len(rows_i), "hash": rows_hash(rows_i, float32)}
+    return indicators
+
+
+#Records the max TimeDim and row hash of every indicator, to be written once the outputs are saved
+#indicators is given instead of df when the states were gathered block by block
+def remember_state(long_csv, df, options, indicators=None):
+    indicators = indicators if indicators is not None else indicator_states(df, options.float32)
+
+    previous = load_state(long_csv)
+    if previous is not None and previous.get("filters") == filter_signature(options):
+        changed = [code for code, seen in indicators.items() if previous["indicators"].get(code, {}).get("hash") != seen["hash"]]
+        print(f" {len(changed)} of {len(indicators)} indicators changed since the previous run")
+
+    _pending[long_csv] = {"filters": filter_signature(options), "indicators": indicators}
+
+
+#Writes the state of the run, call it after the long CSV has been saved
+def save_delta_state(long_csv):
+    state = _pending.pop(long_csv, None)
+    if state is not None:
+        write_json_atomic(state_path(long_csv), state)
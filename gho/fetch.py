@@ -0,0 +1,253 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+import requests
+
+from . import client, cube, delta, negative, odata, spool, stream
+from .client import GHO_API_URL
+from .options import FetchOptions
+
+
+#Collects how long every indicator request took during a run
+class FetchReport:
+    def __init__(self):
+        self.timings = []
+        self.statuses = {}
+        self._lock = threading.Lock()
+
+    def record(self, code, seconds, status, rows, pages=1):
+        with self._lock:
+            self.timings.append({"IndicatorCode": code, "status": status, "rows": rows, "pages": pages,
+                                 "seconds": seconds})
+            self.statuses[code] = status
+
+    def failed_codes(self):
+        return [code for code, status in self.statuses.items() if status != 200]
+
+    def to_frame(self):
+        return pd.DataFrame(self.timings, columns=["IndicatorCode", "status", "rows", "pages", "seconds"])
+
+    def print_summary(self, wall_seconds):
+        timings = self.to_frame()
+        if timings.empty:
+            return
+
+        print(f"\n Fetched {len(timings)} indicators in {wall_seconds:.2f}s "
+              f"(sum of request times {timings['seconds'].sum():.2f}s, "
+              f"slowest {timings['seconds'].max():.2f}s)")
+
+        paged = timings[timings["pages"] > 1]
+        print(f" {timings['rows'].sum()} rows over {timings['pages'].sum()} pages")
+        for t in paged.itertuples():
+            print(f"  {t.IndicatorCode}: {t.rows} rows over {t.pages} pages")
+
+
+#Downloads a follow-up page of an indicator (its nextLink already carries the query options)
+def download_page(url, options):
+    resp = client.get(url, options)
+    return resp.status_code, resp.content
+
+
+#Fetches the rows of a single indicator code into column buffers (None when it failed or has no rows)
+#When columns are given only those fields are requested ($select) and kept
+#since, when given, replaces --since for this code only
+#Every @odata.nextLink is followed; with a prefetch pool the next page downloads while the current one is decoded
+def fetch_indicator_columns(code, report, options=None, columns=None, since=None, prefetch=None):
+    options = options or FetchOptions()
+    print("\n Fetching data for: ", code)
+    start = time.perf_counter()
+    params = odata.build_params(columns, options, since)
+    selected = odata.selected_columns(columns, options)
+    pending = []
+    requested = set()
+    ahead = None
+    looped = False
+
+    #A link that was requested already would only fetch the same rows again
+    def submit(url):
+        nonlocal looped
+        if url in requested:
+            looped = True
+            return
+        requested.add(url)
+        if prefetch is not None:
+            pending.append((url, prefetch.submit(download_page, url, options)))
+        else:
+            future = Future()
+            future.set_result(download_page(url, options))
+            pending.append((url, future))
+
+    #The link to the next page is acted on as soon as it is decoded, unless the tail of the page gave it already
+    def on_meta(key, value):
+        if key == "@odata.nextLink" and value and value != ahead:
+            submit(value)
+
+    #The body is decoded as it streams in, straight into buffers for the selected columns
+    try:
+        with client.get(f"{GHO_API_URL}/{code}", options, params=params, stream=True) as resp:
+            #Status code of 200 means everything is working properly, anything else is skipped
+            if resp.status_code != 200:
+                report.record(code, time.perf_counter() - start, resp.status_code, 0)
+                print(f"  -> status {resp.status_code}, skipping {code}")
+                return None
+
+            buffers, _ = stream.decode_response(resp, selected, on_meta=on_meta)
+    except (requests.RequestException, ValueError) as e:
+        report.record(code, time.perf_counter() - start, 0, 0)
+        print(f"  -> {type(e).__name__} while fetching, skipping {code}")
+        return None
+
+    #A page that fails, or does not decode, would silently truncate the indicator, so the whole code is skipped
+    pages = 1
+    while pending and not looped:
+        url, future = pending.pop(0)
+        try:
+            status, content = future.result()
+        except requests.RequestException:
+            status = 0
+        if status != 200:
+            report.record(code, time.perf_counter() - start, status, buffers.rows, pages)
+            print(f"  -> status {status} on page {pages + 1}, skipping {code}")
+            return None
+
+        pages += 1
+        #GHO writes the link after value[], so it is read from the tail of the page first and the
+        #next page downloads while this one is decoded
+        ahead = stream.tail_next_link(content)
+        if ahead:
+            submit(ahead)
+        try:
+            stream.decode_columns([content], selected, buffers, on_meta)
+        except ValueError as e:
+            report.record(code, time.perf_counter() - start, 0, buffers.rows, pages)
+            print(f"  -> {type(e).__name__} on page {pages}, skipping {code}")
+            return None
+
+    if looped:
+        report.record(code, time.perf_counter() - start, 0, buffers.rows, pages)
+        print(f"  -> @odata.nextLink of page {pages} points back to a page already fetched, skipping {code}")
+        return None
+
+    report.record(code, time.perf_counter() - start, 200, buffers.rows, pages)
+    return buffers if buffers.rows else None
+
+
+#Codes that came back empty or missing on an earlier run are not asked for again until they are due a recheck
+#(except while recording, so the cassette holds every code)
+def skip_known_empty(codes, options):
+    known_empty = negative.open_negative_cache(options)
+    codes, skipped = known_empty.split(codes) if not options.record else (codes, [])
+    if skipped:
+        print(f"\n Skipping {len(skipped)} indicators that returned no data when last checked "
+              f"({len(skipped)} requests avoided, rechecked after {options.recheck_empty:g}h)")
+    return known_empty, codes
+
+
+#Spool of the run and the codes an interrupted attempt already checkpointed in it
+def open_checkpoints(spool_name, codes, columns, options):
+    signature = {"filters": delta.filter_signature(options), "delta": options.delta,
+                 "columns": odata.selected_columns(columns, options), "format": "columns"}
+    checkpoints = spool.open_spool(spool_name, options, signature)
+    done = checkpoints.completed() & set(codes)
+    if done:
+        print(f"\n Resuming: {len(done)} indicators already fetched, {len(codes) - len(done)} left")
+    return checkpoints, done
+
+
+#Reports the fetch and records the codes that came back empty
+def finish_fetch(report, codes, done, since_by_code, known_empty, options, start):
+    report.print_summary(time.perf_counter() - start)
+    client.print_connection_stats(options)
+
+    filtered = options.since is not None or options.until is not None or options.countries
+    unfiltered = set() if filtered else {code for code in codes if since_by_code.get(code) is None}
+    known_empty.update(report, set(codes) - done, unfiltered)
+    known_empty.save()
+
+    if options.timings_path:
+        report.to_frame().to_csv(options.timings_path, index=False)
+
+
+#Fetches every indicator code with a bounded pool of workers and returns one dataframe
+#Frames are concatenated in the order of the codes, so the result matches a serial loop
+#long_csv names the topic's long CSV: every fetched frame is checkpointed to a spool for --resume,
+#and with --delta only newer periods are fetched and merged into the rows of the CSV
+#spool_name checkpoints a run that has no single long CSV (such as the whole suite)
+def fetch_indicator_data(codes, options=None, report=None, columns=None, long_csv=None, spool_name=None):
+    options = options or FetchOptions()
+    report = report if report is not None else FetchReport()
+    all_codes = list(dict.fromkeys(codes))
+    columns = cube.cube_columns(columns, options)
+    known_empty, codes = skip_known_empty(all_codes, options)
+
+    since_by_code, previous_rows = None, None
+    if long_csv and options.delta:
+        since_by_code, previous_rows = delta.plan_delta(codes, long_csv, options, columns)
+    since_by_code = since_by_code or {}
+
+    checkpoints, done = None, set()
+    spool_name = spool_name or (spool.spool_name(long_csv) if long_csv else None)
+    if spool_name:
+        checkpoints, done = open_checkpoints(spool_name, codes, columns, options)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=options.workers) as pool, \
+            ThreadPoolExecutor(max_workers=options.workers) as prefetch:
+        def fetch_one(code):
+            if code in done:
+                return checkpoints.load(code)
+
+            buffers = fetch_indicator_columns(code, report, options, columns, since_by_code.get(code), prefetch)
+            if checkpoints is not None and report.statuses.get(code) == 200:
+                checkpoints.save(code, buffers)
+            return buffers
+
+        parts = list(zip(codes, pool.map(fetch_one, codes)))
+    finish_fetch(report, codes, done, since_by_code, known_empty, options, start)
+
+    #One frame built straight from the column buffers of every code, then the client-side filter in one pass
+    df = stream.build_frame(parts)
+    if not df.empty:
+        since = df["IndicatorCode"].map(since_by_code).astype("float64") if since_by_code else None
+        df = odata.filter_rows(df, options, since)
+    #Codes skipped as known to be empty keep the rows they had in the previous CSV
+    if previous_rows is not None:
+        skipped = set(all_codes) - set(codes)
+        df = delta.merge_delta(previous_rows, df, all_codes, since_by_code, report.failed_codes() + sorted(skipped))
+    if long_csv and not df.empty:
+        delta.remember_state(long_csv, df, options)
+
+    return df
+
+
+#Same fetch as fetch_indicator_data, but the rows of every code go to the spool on disk as soon as
+#they arrive and are dropped from memory; returns the spool, for the out-of-core reshape to read
+def fetch_to_spool(codes, spool_name, options=None, report=None, columns=None):
+    options = options or FetchOptions()
+    report = report if report is not None else FetchReport()
+    codes = list(dict.fromkeys(codes))
+    columns = cube.cube_columns(columns, options)
+    known_empty, codes = skip_known_empty(codes, options)
+    checkpoints, done = open_checkpoints(spool_name, codes, columns, options)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=options.workers) as pool, \
+            ThreadPoolExecutor(max_workers=options.workers) as prefetch:
+        def fetch_one(code):
+            if code not in done:
+                buffers = fetch_indicator_columns(code, report, options, columns, None, prefetch)
+                if report.statuses.get(code) == 200:
+                    checkpoints.save(code, buffers)
+
+        list(pool.map(fetch_one, codes))
+    finish_fetch(report, codes, done, {}, known_empty, options, start)
+    return checkpoints
+
+
+#Call once the topic's outputs are saved: records the delta state and drops the spool of the run
+def complete_run(long_csv, options=None):
+    options = options or FetchOptions()
+    delta.save_delta_state(long_csv)
+    spool.clear_spool(spool.spool_name(long_csv), options)
@@ -0,0 +1,186 @@
+import json
+import os
+import re
+
+from .catalog import cache_dir, names_hash, write_json_atomic
+from .matcher import REGEX_CHARS
+
+
+INDEX_FILE = "catalog_index.json"
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+#Smallest trigram similarity for a catalog word to count as a near miss of a keyword word
+MIN_SIMILARITY = 0.6
+
+
+def tokens(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+#Trigrams of a word, padded so the first and last letters weigh as much as the middle ones
+def trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+#Inverted index over the catalog: every word of IndicatorName and IndicatorCode points at the rows
+#that contain it, and every trigram points at the words that contain it, so exact lookups only
+#touch the rows holding the query words and fuzzy lookups only the words sharing a trigram
+class CatalogIndex:
+    def __init__(self, codes, names, key=None, postings=None, grams=None):
+        self.codes = codes
+        self.names = names
+        self.lower_names = [name.lower() for name in names]
+        self.lower_codes = [code.lower() for code in codes]
+        self.key = key
+
+        if postings is not None:
+            self.postings = {word: set(rows) for word, rows in postings.items()}
+            self.grams = {gram: set(words) for gram, words in grams.items()}
+            return
+
+        self.postings = {}
+        for row, (code, name) in enumerate(zip(codes, names)):
+            for word in set(tokens(name)) | set(tokens(code)) | {code.lower()}:
+                self.postings.setdefault(word, set()).add(row)
+
+        self.grams = {}
+        for word in self.postings:
+            for gram in trigrams(word):
+                self.grams.setdefault(gram, set()).add(word)
+
+    @classmethod
+    def from_catalog(cls, ind_df, key=None):
+        names = ind_df["IndicatorName"].fillna("").astype(str).tolist()
+        codes = ind_df["IndicatorCode"].astype(str).tolist()
+        return cls(codes, names, key)
+
+    #Words of the index containing part, found through the trigrams they share with it
+    def words_containing(self, part):
+        if len(part) < 3:
+            return [word for word in self.postings if part in word]
+        inner = [part[i:i + 3] for i in range(len(part) - 2)]
+        candidates = set.intersection(*(self.grams.get(gram, set()) for gram in inner))
+        return [word for word in candidates if part in word]
+
+    #Rows whose name (or, with codes on, code) contains phrase, with the same case-insensitive
+    #substring meaning as the scripts' search (so "Alcohol" also finds "alcoholic")
+    def rows(self, phrase, codes=True):
+        phrase = phrase.lower()
+        words = tokens(phrase)
+        if not words:
+            return []
+
+        found = None
+        for word in words:
+            rows = set()
+            for match in self.words_containing(word):
+                rows |= self.postings[match]
+            found = rows if found is None else found & rows
+            if not found:
+                return []
+        return sorted(row for row in found
+                      if phrase in self.lower_names[row] or (codes and phrase in self.lower_codes[row]))
+
+    def search(self, phrase):
+        return [(self.codes[row], self.names[row]) for row in self.rows(phrase)]
+
+    #Catalog words closest to word by trigram similarity
+    def similar_words(self, word, limit=3):
+        counts = {}
+        for gram in trigrams(word):
+            for match in self.grams.get(gram, ()):
+                counts[match] = counts.get(match, 0) + 1
+
+        size = len(trigrams(word))
+        scored = [(2 * n / (size + len(trigrams(match))), match) for match, n in counts.items()]
+        scored = [(score, match) for score, match in scored if score >= MIN_SIMILARITY and match != word]
+        return [match for score, match in sorted(scored, key=lambda s: (-s[0], s[1]))[:limit]]
+
+    #Closest phrase to phrase that has hits: every word that is not in the catalog is swapped for
+    #its most similar catalog word. Returns (phrase, rows) or None
+    def fuzzy(self, phrase, codes=True):
+        separators = TOKEN_RE.split(phrase.lower())
+        corrected = []
+        changed = False
+        for word in tokens(phrase):
+            if self.words_containing(word):
+                corrected.append(word)
+                continue
+            similar = self.similar_words(word, limit=1)
+            if not similar:
+                return None
+            corrected.append(similar[0])
+            changed = True
+        if not changed:
+            return None
+
+        #Put the corrected words back between the original punctuation and spaces
+        text = separators[0]
+        for word, sep in zip(corrected, separators[1:]):
+            text += word + sep
+        rows = self.rows(text, codes)
+        return (text, rows) if rows else None
+
+    def to_json(self):
+        return {
+            "key": self.key,
+            "codes": self.codes,
+            "names": self.names,
+            "postings": {word: sorted(rows) for word, rows in self.postings.items()},
+            "grams": {gram: sorted(words) for gram, words in self.grams.items()},
+        }
+
+
+#Index of the loaded catalog, read from the cache next to it while the catalog has not changed
+def load_index(ind_df, options):
+    key = names_hash(ind_df)
+    path = os.path.join(cache_dir(options), INDEX_FILE)
+
+    if os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("key") == key:
+                return CatalogIndex(cached["codes"], cached["names"], key, cached["postings"], cached["grams"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    index = CatalogIndex.from_catalog(ind_df, key)
+    write_json_atomic(path, index.to_json())
+    return index
+
+
+#Checks every keyword of the given topics against the index. Returns one record per keyword with
+#its number of hits and, for keywords without hits, the closest phrase that does have some
+def keyword_report(topics, index):
+    report = []
+    for topic in topics:
+        for keyword in topic.keywords:
+            #Keywords are matched against names only, as the scripts do. The few written as regular
+            #expressions are checked the way the scripts use them
+            if REGEX_CHARS & set(keyword):
+                regex = re.compile(keyword, re.IGNORECASE)
+                hits = sum(1 for name in index.names if regex.search(name))
+            else:
+                hits = len(index.rows(keyword, codes=False))
+            record = {"topic": topic.name, "keyword": keyword, "hits": hits,
+                      "suggestion": None, "suggestion_hits": 0}
+            if record["hits"] == 0:
+                near = index.fuzzy(keyword, codes=False)
+                if near:
+                    record["suggestion"], rows = near
+                    record["suggestion_hits"] = len(rows)
+            report.append(record)
+    return report
+
+
+def print_keyword_report(report):
+    missing = [r for r in report if r["hits"] == 0]
+    print(f"\n {len(report)} keywords checked, {len(missing)} match no indicator")
+    for r in missing:
+        if r["suggestion"]:
+            print(f"  {r['topic']}: '{r['keyword']}' -> did you mean '{r['suggestion']}' "
+                  f"({r['suggestion_hits']} indicators)?")
+        else:
+            print(f"  {r['topic']}: '{r['keyword']}' has no close match either")
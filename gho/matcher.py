@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import re
+from collections import deque
+
+from .catalog import cache_dir, names_hash, write_json_atomic
+
+
+MATCHES_FILE = "topic_matches.json"
+
+#Characters that make a keyword a regular expression rather than plain text
+REGEX_CHARS = set("()[]{}.*+?^$|\\")
+
+
+#Aho-Corasick automaton over the keywords of every topic: one pass over a name finds every
+#keyword it contains, so the whole catalog is classified into all topics in a single scan
+class KeywordMatcher:
+    def __init__(self, keywords_by_topic):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [set()]
+        self.patterns = {}
+
+        #The scripts join their keywords into one regular expression, so the few keywords that use
+        #regex syntax keep their regex meaning (e.g. "plan(s)" matches "plans")
+        for topic, keywords in keywords_by_topic.items():
+            for keyword in keywords:
+                if REGEX_CHARS & set(keyword):
+                    self.patterns.setdefault(topic, []).append(keyword)
+                else:
+                    self.add(keyword.lower(), topic)
+        self.regexes = {topic: re.compile("|".join(p), re.IGNORECASE) for topic, p in self.patterns.items()}
+        self.build()
+
+    def add(self, keyword, topic):
+        node = 0
+        for ch in keyword:
+            if ch not in self.goto[node]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(set())
+                self.goto[node][ch] = len(self.goto) - 1
+            node = self.goto[node][ch]
+        self.output[node].add(topic)
+
+    #Breadth-first pass that sets the failure link of every node and merges the outputs along it
+    def build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and ch not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(ch, 0)
+                self.output[child] |= self.output[self.fail[child]]
+
+    #Every topic with at least one keyword in text
+    def match(self, text):
+        topics = set()
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        for ch in text.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if output[node]:
+                topics |= output[node]
+
+        for topic, regex in self.regexes.items():
+            if topic not in topics and regex.search(text):
+                topics.add(topic)
+        return topics
+
+    #Topic -> sorted indicator codes whose IndicatorName contains one of the topic's keywords
+    def classify(self, ind_df):
+        codes = {topic: set() for topic in self.topics()}
+        names = ind_df["IndicatorName"]
+        for code, name in zip(ind_df["IndicatorCode"], names):
+            if isinstance(name, str):
+                for topic in self.match(name):
+                    codes[topic].add(code)
+        return {topic: sorted(c) for topic, c in codes.items()}
+
+    def topics(self):
+        found = set(self.patterns)
+        for out in self.output:
+            found |= out
+        return found
+
+
+#Hash of what the classification depends on: the catalog names and every topic's keywords
+def matches_key(ind_df, keywords_by_topic):
+    catalog = names_hash(ind_df)
+    keywords = hashlib.sha256(json.dumps(keywords_by_topic, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"{catalog}:{keywords}"
+
+
+#Topic -> codes for every given topic, read from the cache next to the catalog when neither the
+#catalog nor the keywords changed since it was written
+def topic_matches(topics, ind_df, options):
+    keywords_by_topic = {topic.name: list(topic.keywords) for topic in topics}
+    key = matches_key(ind_df, keywords_by_topic)
+    path = os.path.join(cache_dir(options), MATCHES_FILE)
+
+    if os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("key") == key:
+                print("Using cached topic matches", path)
+                return cached["topics"]
+        except (OSError, ValueError):
+            pass
+
+    matches = KeywordMatcher(keywords_by_topic).classify(ind_df)
+    matches = {name: matches.get(name, []) for name in keywords_by_topic}
+    write_json_atomic(path, {"key": key, "topics": matches})
+    return matches
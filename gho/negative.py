@@ -0,0 +1,81 @@
+import json
+import os
+import time
+
+from .catalog import cache_dir, write_json_atomic
+from .client import GHO_API_URL
+
+
+NEGATIVE_FILE = "negative_codes.json"
+
+
+#Only a 404 says the code itself is missing. Any other 4xx can come from the query a run sent ($select,
+#$filter), and a 429, a 5xx or a lost connection only says the server was busy, so those codes are
+#tried again on the next run
+def is_missing(status):
+    return status == 404
+
+
+#Where the answers of a run come from: the server GHO_API_URL points at, or the cassette with --replay
+def answer_source(options):
+    if options.replay:
+        return f"replay:{os.path.abspath(options.replay)}"
+    return GHO_API_URL
+
+
+#Indicator codes that returned no rows or a missing status, with when they were last checked
+#Runs skip them until the recheck interval has passed, then fetch them once more
+#The file keeps the codes of every source apart, so codes empty on the stand-in or in a cassette are
+#never skipped against the real API (a file without sources, from before, is ignored)
+class NegativeCache:
+    def __init__(self, path, recheck_hours, source=GHO_API_URL):
+        self.path = path
+        self.recheck_seconds = recheck_hours * 3600
+        self.source = source
+        self.sources = {}
+
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.sources = json.load(f).get("sources", {})
+            except (OSError, ValueError, AttributeError):
+                self.sources = {}
+        self.entries = self.sources.setdefault(source, {})
+
+    #Splits codes into the ones to fetch and the ones known to be empty that are not due a recheck
+    def split(self, codes):
+        now = time.time()
+        fetch, skipped = [], []
+        for code in codes:
+            entry = self.entries.get(code)
+            if entry is not None and now - entry["checked"] < self.recheck_seconds:
+                skipped.append(code)
+            else:
+                fetch.append(code)
+        return fetch, skipped
+
+    #Records the outcome of the codes fetched in this run
+    #An empty answer or a 404 only counts when the request was not filtered: a filtered run can be
+    #empty for a code that has rows outside the filter
+    def update(self, report, codes, unfiltered):
+        outcome = {}
+        for t in report.timings:
+            if t["IndicatorCode"] in codes:
+                outcome[t["IndicatorCode"]] = t
+
+        now = time.time()
+        for code, t in outcome.items():
+            if t["status"] == 200 and t["rows"] > 0:
+                self.entries.pop(code, None)
+            elif t["status"] == 200 and code in unfiltered:
+                self.entries[code] = {"checked": now, "reason": "empty"}
+            elif is_missing(t["status"]) and code in unfiltered:
+                self.entries[code] = {"checked": now, "reason": f"status {t['status']}"}
+
+    def save(self):
+        write_json_atomic(self.path, {"sources": self.sources})
+
+
+def open_negative_cache(options):
+    return NegativeCache(os.path.join(cache_dir(options), NEGATIVE_FILE), options.recheck_empty,
+                         answer_source(options))
@@ -0,0 +1,66 @@
+#Builds the OData query options sent with each /api/{IndicatorCode} request
+import pandas as pd
+
+
+#Columns to project the rows on, or None when every field should be downloaded
+def selected_columns(columns, options):
+    if not columns or not options.select:
+        return None
+    return list(dict.fromkeys(columns))
+
+
+def quote(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+#$filter for the year range and country subset asked for, or None when every row is wanted
+#since overrides options.since for a single indicator (used by the delta refresh)
+def filter_clause(options, since=None):
+    since = since if since is not None else options.since
+    clauses = []
+
+    if since is not None:
+        clauses.append(f"TimeDim ge {int(since)}")
+    if options.until is not None:
+        clauses.append(f"TimeDim le {int(options.until)}")
+    if options.countries:
+        countries = " or ".join(f"SpatialDim eq {quote(c)}" for c in options.countries)
+        clauses.append(f"({countries})" if len(options.countries) > 1 else countries)
+
+    return " and ".join(clauses) or None
+
+
+#$select limits the fields the API returns to the columns the downstream stage needs
+#and $filter lets the server drop the years and countries that are not wanted
+def build_params(columns, options, since=None):
+    params = {}
+    selected = selected_columns(columns, options)
+    if selected:
+        params["$select"] = ",".join(selected)
+
+    where = filter_clause(options, since)
+    if where:
+        params["$filter"] = where
+    return params
+
+
+#Applies the same year and country filter to rows already downloaded, in case the server ignored $filter
+#since is one year, or a Series with the year of every row when each indicator has its own (delta)
+def filter_rows(df, options, since=None):
+    since = since if since is not None else options.since
+    mask = None
+
+    if isinstance(since, pd.Series) and "TimeDim" in df.columns:
+        mask = since.isna() | (df["TimeDim"] >= since)
+    elif since is not None and "TimeDim" in df.columns:
+        mask = df["TimeDim"] >= int(since)
+    if options.until is not None and "TimeDim" in df.columns:
+        keep = df["TimeDim"] <= int(options.until)
+        mask = keep if mask is None else mask & keep
+    if options.countries and "SpatialDim" in df.columns:
+        keep = df["SpatialDim"].isin(options.countries)
+        mask = keep if mask is None else mask & keep
+
+    if mask is None:
+        return df
+    return df[mask].reset_index(drop=True)
@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+
+
+#Number of indicator codes fetched at the same time when nothing else is asked for
+DEFAULT_WORKERS = 8
+
+#How long the cached indicator catalog is used before it is fetched again
+DEFAULT_CATALOG_TTL_HOURS = 24
+
+#Seconds to wait for a connection to open and for the server to answer
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 120
+
+#Retries of a failed request, and the base and cap in seconds of the backoff between them
+DEFAULT_RETRIES = 4
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30
+
+#Failures in a row that pause every worker, and for how many seconds
+DEFAULT_BREAKER_THRESHOLD = 8
+DEFAULT_BREAKER_COOLDOWN = 30
+
+#Hours an indicator code that returned nothing is skipped before it is fetched again
+DEFAULT_RECHECK_EMPTY_HOURS = 168
+
+
+#Settings shared by every stage of a topic run (filled in from the command line by parse_args)
+@dataclass
+class FetchOptions:
+    workers: int = DEFAULT_WORKERS
+    timings_path: str = None
+    cache_dir: str = None
+    catalog_ttl: float = DEFAULT_CATALOG_TTL_HOURS
+    refresh_catalog: bool = False
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+    read_timeout: float = DEFAULT_READ_TIMEOUT
+    select: bool = True
+    since: int = None
+    until: int = None
+    countries: list = None
+    delta: bool = False
+    resume: bool = False
+    retries: int = DEFAULT_RETRIES
+    backoff: float = DEFAULT_BACKOFF
+    max_backoff: float = DEFAULT_MAX_BACKOFF
+    breaker_threshold: int = DEFAULT_BREAKER_THRESHOLD
+    breaker_cooldown: float = DEFAULT_BREAKER_COOLDOWN
+    recheck_empty: float = DEFAULT_RECHECK_EMPTY_HOURS
+    record: str = None
+    replay: str = None
+    compact: bool = False
+    float32: bool = False
+    cube: bool = False
+    sparse: bool = False
+    memory_budget: float = None
+    reshape_workers: int = 1
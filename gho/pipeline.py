@@ -0,0 +1,155 @@
+import time
+
+import pandas as pd
+
+from . import delta, spool
+from .catalog import load_catalog
+from .compact import compact_long
+from .cube import save_cube
+from .fetch import FetchReport, complete_run, fetch_indicator_data
+from .options import FetchOptions
+from .matcher import topic_matches
+from .registry import NEEDED_COLS, load_registry
+from .reshape import pivot_wide
+
+
+#Topic -> codes of every registered topic and of the given ones. One scan of the catalog classifies
+#it into all of them at once, so later runs of any topic or subset of topics reuse the cached mapping
+def registry_matches(topics, ind_df, options):
+    registered = {topic.name: topic for topic in load_registry().values()}
+    registered.update({topic.name: topic for topic in topics})
+    return topic_matches(registered.values(), ind_df, options)
+
+
+#Indicators of a topic: every catalog entry whose IndicatorName matches one of its keywords
+def find_indicators(topic, ind_df, options=None):
+    options = options or FetchOptions()
+    codes = registry_matches([topic], ind_df, options)[topic.name]
+    mask = ind_df["IndicatorCode"].isin(codes)
+
+    return (
+        ind_df.loc[mask, ["IndicatorCode", "IndicatorName"]]
+        .drop_duplicates()
+        .sort_values("IndicatorCode")
+        .reset_index(drop=True)
+    )
+
+
+#Long rows of a topic: the needed columns, SpatialDim and TimeDim renamed, rows without a key dropped
+#(and rows without a NumericValue too, for the topics with drop_missing_values set)
+def clean_rows(topic, df):
+    missing = [c for c in NEEDED_COLS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Expected columns {NEEDED_COLS}, but missing {missing} in {topic.name} data")
+
+    #Countries and regions are referred to as SpatialDim in GHO data, which is why they're being renamed
+    clean = (
+        df[NEEDED_COLS]
+        .rename(columns={"SpatialDim": topic.spatial_column, "TimeDim": "YEAR"})
+        .dropna(subset=[topic.spatial_column, "YEAR", "IndicatorCode"])
+    )
+    if topic.drop_missing_values:
+        clean = clean.dropna(subset=["NumericValue"])
+    clean["YEAR"] = clean["YEAR"].astype(int)
+    return clean
+
+
+#Long and wide tables of a topic (COUNTRY x (IndicatorCode, YEAR), the mean of every cell)
+def clean_and_reshape(topic, df, options=None):
+    clean = compact_long(clean_rows(topic, df), options)
+
+    wide = pivot_wide(
+        clean,
+        index=topic.spatial_column,
+        columns=["IndicatorCode", "YEAR"],
+        values="NumericValue",
+        options=options
+    )
+    return clean, wide
+
+
+def save_outputs(topic, clean, wide):
+    clean.to_csv(topic.long_path, index=False)
+    wide.to_csv(topic.wide_path)
+    print(f"Saved {topic.folder}/{topic.long_csv} and {topic.folder}/{topic.wide_csv}")
+
+
+#Runs a single topic, as its script in the topic folder does: finds its indicators in the catalog,
+#fetches them (with --delta, --resume and the rest of the options) and saves its outputs
+def run_topic(topic, options=None):
+    options = options or FetchOptions()
+
+    #The catalog comes from the shared on-disk cache and is only downloaded when the cache is stale
+    ind_df = load_catalog(options)
+    print("Total indicators found: ", len(ind_df))
+
+    inds = find_indicators(topic, ind_df, options)
+    print(f"\n {topic.name} indicators found: ")
+    print(inds)
+
+    df = fetch_indicator_data(inds["IndicatorCode"], options, columns=NEEDED_COLS, long_csv=topic.long_path)
+    if df.empty:
+        raise SystemExit("No data collected. Check API connection for error.")
+    print(df.head())
+
+    clean, wide = clean_and_reshape(topic, df, options)
+    print(f"\n Cleaned up long-format {topic.name} data")
+    print(clean.head())
+    print(f"\n Wide table ({topic.spatial_column} x (IndicatorCode, YEAR))")
+    print(wide.head())
+
+    save_outputs(topic, clean, wide)
+    #With --cube every row is also kept by sex, age and the other breakdowns instead of averaged
+    save_cube(df, topic.long_path, options)
+    complete_run(topic.long_path, options)
+
+
+#Indicator codes of every topic, and their union in first-seen order
+def match_topics(topics, options):
+    matches = registry_matches(topics, load_catalog(options), options)
+
+    topic_codes = {}
+    for topic in topics:
+        topic_codes[topic.name] = matches[topic.name]
+        print(f" {topic.name}: {len(topic_codes[topic.name])} indicators")
+    union = list(dict.fromkeys(code for codes in topic_codes.values() for code in codes))
+
+    requested = sum(len(codes) for codes in topic_codes.values())
+    print(f"\n Suite: {len(topics)} topics ask for {requested} indicators, {len(union)} of them distinct "
+          f"({requested - len(union)} redundant requests saved)")
+    return topic_codes, union
+
+
+#Runs any set of topics in one process: the catalog, connection pool and caches are shared,
+#and every indicator code the topics have in common is fetched only once
+def run_topics(topics, options=None):
+    options = options or FetchOptions()
+    if options.delta:
+        print("--delta applies to single topic runs, the suite fetches every indicator in full")
+        options.delta = False
+
+    topic_codes, union = match_topics(topics, options)
+
+    start = time.perf_counter()
+    report = FetchReport()
+    suite_df = fetch_indicator_data(union, options, report, columns=NEEDED_COLS, spool_name="suite")
+    print(f" Suite fetch took {time.perf_counter() - start:.2f}s")
+
+    #Every topic gets the rows of its own codes, in the order its own run would have fetched them
+    by_code = dict(tuple(suite_df.groupby("IndicatorCode", sort=False, observed=True))) if not suite_df.empty else {}
+    for topic in topics:
+        frames = [by_code[code] for code in topic_codes[topic.name] if code in by_code]
+        if not frames:
+            print(f"\n No data collected for {topic.name}, skipping it")
+            continue
+
+        topic_df = pd.concat(frames, ignore_index=True)
+        print(f"\n Building {topic.name} outputs from {len(frames)} indicators")
+        topic_long, topic_wide = clean_and_reshape(topic, topic_df, options)
+        save_outputs(topic, topic_long, topic_wide)
+        save_cube(topic_df, topic.long_path, options)
+        delta.remember_state(topic.long_path, topic_df, options)
+        delta.save_delta_state(topic.long_path)
+
+    spool.clear_spool("suite", options)
+    return report
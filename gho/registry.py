@@ -0,0 +1,61 @@
+import os
+import tomllib
+from dataclasses import dataclass
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REGISTRY_PATH = os.path.join(ROOT, "topics.toml")
+
+#Columns of the GHO data the long and wide outputs are built from
+NEEDED_COLS = ["SpatialDim", "TimeDim", "IndicatorCode", "NumericValue"]
+
+
+#One topic as declared in topics.toml
+@dataclass
+class Topic:
+    name: str
+    script: str
+    folder: str
+    keywords: list
+    spatial_column: str
+    long_csv: str
+    wide_csv: str
+    drop_missing_values: bool = False
+
+    #Outputs are written next to the topic script, as when the script is run from its folder
+    def output_path(self, file_name):
+        return os.path.join(ROOT, self.folder, file_name)
+
+    @property
+    def long_path(self):
+        return self.output_path(self.long_csv)
+
+    @property
+    def wide_path(self):
+        return self.output_path(self.wide_csv)
+
+
+def load_registry(path=REGISTRY_PATH):
+    with open(path, "rb") as f:
+        tables = tomllib.load(f)
+
+    topics = {}
+    for name, table in tables.items():
+        try:
+            topics[name] = Topic(name=name, **table)
+        except TypeError as e:
+            raise ValueError(f"Topic [{name}] in {path} is not valid: {e}") from None
+        if not topics[name].keywords:
+            raise ValueError(f"Topic [{name}] in {path} has no keywords")
+    return topics
+
+
+#Picks the topics named on the command line ("HIV,WHS"), or every topic when none are named
+def select_topics(registry, names=None):
+    if not names:
+        return list(registry.values())
+
+    unknown = [n for n in names if n not in registry]
+    if unknown:
+        raise SystemExit(f"Unknown topics {unknown}, choose from {', '.join(registry)}")
+    return [registry[n] for n in names]
@@ -0,0 +1,311 @@
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+
+#pd.factorize with the labels sorted: the keys are hashed once in row order and only the few
+#distinct labels are sorted, instead of sorting and hashing all the rows again
+def sorted_factorize(values):
+    codes, labels = pd.factorize(values)
+    order = np.argsort(np.asarray(labels), kind="stable")
+    rank = np.empty(len(order), dtype=codes.dtype)
+    rank[order] = np.arange(len(order), dtype=codes.dtype)
+    if (codes < 0).any():
+        return np.where(codes >= 0, rank[codes], -1), labels.take(order)
+    return rank[codes], labels.take(order)
+
+
+#Integer codes of the keys that occur, renumbered 0..k-1 in sorted order, and which of the k codes
+#they came from; the bincount is linear, np.unique (a sort) is only used for a very sparse key space
+def used_codes(codes, space):
+    if space <= max(4 * len(codes), 1 << 20):
+        used = np.bincount(codes, minlength=space) > 0
+        return (np.cumsum(used) - 1)[codes], np.flatnonzero(used)
+
+    used, positions = np.unique(codes, return_inverse=True)
+    return positions, used
+
+
+#Most rows a cell may hold for its rows to be ranked by peeling, one linear pass per rank; past
+#that a single stable sort of all the rows is cheaper
+MAX_PEEL_RANKS = 16
+
+
+#The groups of a rank as a slice when they are all of them (None stands for all), so the passes
+#over such a rank read and write whole arrays instead of gathering and scattering
+def every_group(groups, count):
+    if groups is None or len(groups) == count:
+        return slice(None)
+    return groups
+
+
+#Rows of the cells rank by rank, in row order: for every rank, the cells (positions in where, or a
+#slice of all of them when every cell has one) that have a row of that rank and that row. Each pass
+#peels off the first row left in every cell with np.minimum.at, so a few rows per cell (one per sex,
+#say) cost a few linear passes instead of a sort
+def ranked_rows(cells, counts, where, sizes):
+    top = sizes.max(initial=0)
+    if top > MAX_PEEL_RANKS:
+        order = np.argsort(cells, kind="stable")
+        starts = np.cumsum(sizes) - sizes
+        for rank in range(top):
+            groups = every_group(np.flatnonzero(sizes > rank) if rank else None, len(where))
+            yield groups, order[starts[groups] + rank]
+        return
+
+    #int32 row and cell numbers whenever they fit, so the passes read half the memory
+    dtype = np.int32 if len(cells) < np.iinfo(np.int32).max else np.int64
+    if len(where) == len(counts):
+        row_groups = cells.astype(dtype, copy=False)
+    else:
+        slot = np.zeros(len(counts), dtype=dtype)
+        slot[where] = np.arange(len(where), dtype=dtype)
+        row_groups = slot[cells]
+        del slot
+    #Row numbers, with the rows already taken set past the end so the minimum skips them
+    rows = np.arange(len(cells), dtype=dtype)
+    for rank in range(top):
+        first = np.full(len(where), len(cells), dtype=dtype)
+        np.minimum.at(first, row_groups, rows)
+        groups = every_group(np.flatnonzero(first < len(cells)) if rank else None, len(where))
+        if not isinstance(groups, slice):
+            first = first[groups]
+        yield groups, first
+        rows[first] = len(cells)
+
+
+#Sum of every cell, added in row order with the same Kahan compensation as the pandas groupby
+#sum and mean, so the results match pivot_table to the last bit. counts holds the number of rows of
+#every cell; every rank of rows (the first row of every cell, then the second, and so on) is added
+#in one vectorized pass
+def cell_sums(cells, vals, counts):
+    where = np.flatnonzero(counts)
+    sizes = counts[where]
+
+    total = np.zeros(len(where), dtype=vals.dtype)
+    compensation = np.zeros(len(where), dtype=vals.dtype)
+    #An inf value makes its compensation inf - inf (NaN), which is reset to 0 as pandas does
+    with np.errstate(invalid="ignore"):
+        for groups, rows in ranked_rows(cells, counts, where, sizes):
+            y = vals[rows] - compensation[groups]
+            t = total[groups] + y
+            compensation[groups] = t - total[groups] - y
+            compensation[np.isnan(compensation)] = 0
+            total[groups] = t
+
+    return where, total
+
+
+#Mean of every cell, from the compensated sums above
+def cell_means(cells, vals, counts):
+    where, total = cell_sums(cells, vals, counts)
+    return where, total / counts[where].astype(vals.dtype)
+
+
+#Wide table kept sparse in CSR form: for every row, the positions of its columns that hold a value
+#(indices[indptr[i]:indptr[i + 1]], sorted) and those values. Memory follows the number of
+#observations instead of rows x columns. head(), the repr and to_csv() work as on the dense
+#DataFrame, and to_csv() writes the same bytes while only ever making one row dense
+class SparseWide:
+    def __init__(self, index, columns, indptr, indices, values):
+        self.index = index
+        self.columns = columns
+        self.indptr = indptr
+        self.indices = indices
+        self.values = values
+
+    @property
+    def shape(self):
+        return len(self.index), len(self.columns)
+
+    @property
+    def nnz(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.values.nbytes
+
+    #Size the same table takes as a dense DataFrame of NaN and values
+    @property
+    def dense_nbytes(self):
+        return self.shape[0] * self.shape[1] * self.values.dtype.itemsize
+
+    @property
+    def density(self):
+        cells = self.shape[0] * self.shape[1]
+        return self.nnz / cells if cells else 0.0
+
+    #Dense values of the rows start..stop
+    def dense_rows(self, start, stop):
+        block = np.full((stop - start, self.shape[1]), np.nan, dtype=self.values.dtype)
+        lo, hi = self.indptr[start], self.indptr[stop]
+        rows = np.repeat(np.arange(stop - start), np.diff(self.indptr[start:stop + 1]))
+        block[rows, self.indices[lo:hi]] = self.values[lo:hi]
+        return block
+
+    def head(self, n=5):
+        n = min(n, self.shape[0])
+        return pd.DataFrame(self.dense_rows(0, n), index=self.index[:n], columns=self.columns)
+
+    def to_dense(self):
+        return pd.DataFrame(self.dense_rows(0, self.shape[0]), index=self.index, columns=self.columns)
+
+    def __repr__(self):
+        with pd.option_context("display.show_dimensions", False):
+            head = repr(self.head())
+        return (f"{head}\n\n[{self.shape[0]} rows x {self.shape[1]} columns, sparse: "
+                f"{self.nnz} values, {100 * self.density:.2f}% filled]")
+
+    #Label and CSV fields of every row, with the values formatted as pandas writes them (numpy's
+    #shortest repr) and empty fields for the cells without a value; one row is dense at a time
+    def row_fields(self):
+        fields = np.empty(self.shape[1], dtype=object)
+        text = self.values.astype(str)
+        for i, label in enumerate(self.index):
+            lo, hi = self.indptr[i], self.indptr[i + 1]
+            fields[:] = ""
+            fields[self.indices[lo:hi]] = text[lo:hi]
+            yield label, fields
+
+    #Writes what DataFrame.to_csv(path) would: pandas writes the header of the empty frame,
+    #then every row goes through the csv module
+    def to_csv(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            pd.DataFrame(index=self.index[:0], columns=self.columns).to_csv(f, lineterminator=os.linesep)
+            writer = csv.writer(f, lineterminator=os.linesep)
+            for label, fields in self.row_fields():
+                writer.writerow([label, *fields])
+
+
+#Integer keys of a pivot: the position of every row's cell in rows x columns (used rows and
+#columns only, both sorted), the values, and the labels of the rows and columns
+def pivot_keys(df, index, columns, values):
+    columns = [columns] if isinstance(columns, str) else list(columns)
+    vals = df[values].to_numpy()
+    dtype = vals.dtype if vals.dtype.kind == "f" else np.dtype("float64")
+    vals = vals.astype(dtype, copy=False)
+
+    #Rows without a value or without a key never reach the table
+    keep = ~np.isnan(vals)
+    row_codes, row_labels = sorted_factorize(df[index])
+    keep &= row_codes >= 0
+    col_codes, col_labels = [], []
+    for name in columns:
+        codes, labels = sorted_factorize(df[name])
+        keep &= codes >= 0
+        col_codes.append(codes)
+        col_labels.append(labels)
+
+    #One integer per column key combination, in the sorted order of the keys
+    combined = np.zeros(len(df), dtype="int64")
+    space = 1
+    for codes, labels in zip(col_codes, col_labels):
+        combined *= len(labels)
+        combined += codes
+        space *= len(labels)
+    del col_codes, codes
+    if not keep.all():
+        row_codes, combined, vals = row_codes[keep], combined[keep], vals[keep]
+    del keep
+
+    row_pos, used_rows = used_codes(row_codes, len(row_labels))
+    col_pos, used_cols = used_codes(combined, space)
+    del row_codes, combined
+    cells = row_pos.astype("int64")
+    cells *= len(used_cols)
+    cells += col_pos
+    del row_pos, col_pos
+
+    #Splits the combined integers back into one level per column key
+    levels = []
+    remaining = used_cols
+    for labels in reversed(col_labels):
+        levels.append(pd.Index(labels).take(remaining % len(labels)))
+        remaining = remaining // len(labels)
+    levels.reverse()
+
+    col_index = pd.MultiIndex.from_arrays(levels, names=columns) if len(columns) > 1 else levels[0].rename(columns[0])
+    row_index = pd.Index(pd.Index(row_labels).take(used_rows), name=index)
+    return cells, vals, row_index, col_index
+
+
+#Builds the same wide table as df.pivot_table(index=index, columns=columns, values=values) (the mean of
+#every cell, rows and columns without any value left out, both sorted) without a groupby over the keys:
+#every key is factorized to integers once, each row gets the flat position of its cell, and the values
+#are scattered straight into one preallocated array. Only when some cells hold more than one row (for
+#example one row per sex) are those averaged. With --sparse the table is a SparseWide instead
+def pivot_wide(df, index, columns, values, options=None):
+    cells, vals, row_index, col_index = pivot_keys(df, index, columns, values)
+    if options is not None and options.sparse:
+        wide = sparse_wide(cells, vals, row_index, col_index)
+        print(f"\n Sparse wide table: {wide.nnz} values in {wide.shape[0]} x {wide.shape[1]} "
+              f"({100 * wide.density:.2f}% filled), {wide.nbytes / 1e6:.2f} MB instead of {wide.dense_nbytes / 1e6:.2f} MB dense")
+        return wide
+
+    out = np.empty(len(row_index) * len(col_index), dtype=vals.dtype)
+    single, others, groups, where = split_cells(cells, out)
+    out.fill(np.nan)
+    #A cell of one row holds that value as it is (+ 0 turns -0.0 into 0.0, as the sum of pandas does)
+    out[cells[single]] = vals[single] + 0
+    if groups is not None:
+        out[where] = cell_means(groups, vals[others], np.bincount(groups))[1]
+
+    #copy=False: the table is built straight around out instead of a second rows x columns copy
+    return pd.DataFrame(out.reshape(len(row_index), len(col_index)), index=row_index, columns=col_index,
+                        copy=False)
+
+
+#Which rows are the only row of their cell, the other rows (a slice of all of them when no cell has
+#a single row) and, for those in row order, the number of their cell among the repeated cells, and
+#the position of every repeated cell (None when no cell repeats). out, the table about to be filled,
+#is borrowed as scratch space so nothing else of size rows x columns is allocated: every row writes
+#its row number into its cell, and the number a row reads back names the row that owns its cell;
+#the rest only takes arrays of one entry per row
+def split_cells(cells, out):
+    #int32 row numbers whenever they fit, written into the first half of out's bytes for a float64 table
+    if len(cells) < np.iinfo(np.int32).max:
+        scratch = out.view(np.int32)[:len(out)]
+    else:
+        scratch = out.view(np.int64) if out.itemsize == 8 else np.empty(len(out), dtype=np.int64)
+    rows = np.arange(len(cells), dtype=scratch.dtype)
+    scratch[cells] = rows
+    owner = np.take(scratch, cells)
+    owns = owner == rows
+    del rows
+    if owns.all():
+        return owns, None, None, None
+
+    #Owners of a repeated cell are the rows another row points at; they number the repeated cells
+    repeated = np.zeros(len(cells), dtype=bool)
+    repeated[owner[~owns]] = True
+    single = owns & ~repeated
+    del owns
+    others = ~single if single.any() else slice(None)
+    number = np.cumsum(repeated, dtype=scratch.dtype) - 1
+    return single, others, number[owner[others]], cells[repeated]
+
+
+#The SparseWide of the cells: they are sorted once, and the cells repeated by several rows are
+#averaged the same way as in the dense table, so nothing of size rows x columns is ever allocated
+def sparse_wide(cells, vals, row_index, col_index):
+    order = np.argsort(cells, kind="stable")
+    cells, vals = cells[order], vals[order]
+    del order
+
+    first = np.ones(len(cells), dtype=bool)
+    first[1:] = cells[1:] != cells[:-1]
+    if not first.all():
+        groups = np.cumsum(first) - 1
+        vals = cell_means(groups, vals, np.bincount(groups))[1]
+        cells = cells[first]
+    del first
+
+    per_row = np.bincount(cells // len(col_index), minlength=len(row_index))
+    indptr = np.zeros(len(row_index) + 1, dtype="int64")
+    np.cumsum(per_row, out=indptr[1:])
+    indices = (cells % len(col_index)).astype("int32")
+
+    return SparseWide(row_index, col_index, indptr, indices, vals)
@@ -0,0 +1,77 @@
+import json
+import os
+import pickle
+import shutil
+
+from .catalog import cache_dir, write_json_atomic
+
+
+MANIFEST_FILE = "manifest.json"
+
+
+#Checkpoints the column buffers of every fetched indicator to disk as soon as it completes, so a failed run can resume
+class Spool:
+    def __init__(self, path, signature, resume=False):
+        self.path = path
+        manifest_path = os.path.join(path, MANIFEST_FILE)
+
+        #Buffers fetched with other filters or columns cannot be reused
+        manifest = None
+        if resume and os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        if manifest != signature:
+            if resume:
+                print("Nothing to resume from in", path, "starting a fresh run")
+            shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path)
+            write_json_atomic(manifest_path, signature)
+
+    def frame_path(self, code):
+        return os.path.join(self.path, f"{code}.pkl")
+
+    def empty_path(self, code):
+        return os.path.join(self.path, f"{code}.empty")
+
+    #Codes fetched by an earlier attempt, including the ones that returned no rows
+    def completed(self):
+        done = set()
+        for name in os.listdir(self.path):
+            code, ext = os.path.splitext(name)
+            if ext in (".pkl", ".empty"):
+                done.add(code)
+        return done
+
+    def save(self, code, buffers):
+        if buffers is None:
+            open(self.empty_path(code), "w").close()
+            return
+
+        tmp_path = f"{self.frame_path(code)}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(buffers, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.frame_path(code))
+
+    def load(self, code):
+        if os.path.exists(self.frame_path(code)):
+            with open(self.frame_path(code), "rb") as f:
+                return pickle.load(f)
+        return None
+
+
+#Each topic spools into its own folder, named after its long CSV
+def spool_name(long_csv):
+    return os.path.splitext(os.path.basename(long_csv))[0]
+
+
+def spool_path(name, options):
+    return os.path.join(cache_dir(options), "spool", name)
+
+
+def open_spool(name, options, signature):
+    return Spool(spool_path(name, options), signature, options.resume)
+
+
+#Removes a spool once the outputs built from it are saved
+def clear_spool(name, options):
+    shutil.rmtree(spool_path(name, options), ignore_errors=True)
@@ -0,0 +1,315 @@
+import gzip
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import get_context
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+
+#Rows per page before the stand-in answers with an @odata.nextLink
+DEFAULT_PAGE_SIZE = 1000
+
+#Shape of the synthetic fixtures at scale 1: countries x years x Dim1 values per indicator
+FIXTURE_COUNTRIES = 50
+FIXTURE_YEARS = range(2000, 2020)
+FIXTURE_DIM1 = ["SEX_BTSX", "SEX_MLE", "SEX_FMLE"]
+FIXTURE_REGIONS = ["AFR", "AMR", "EMR", "EUR", "SEAR", "WPR"]
+
+TOKEN_RE = re.compile(r"\s*(\(|\)|'(?:[^']|'')*'|-?\d+(?:\.\d+)?|[A-Za-z_][A-Za-z0-9_]*)")
+COMPARE = {
+    "eq": lambda a, b: a == b,
+    "ne": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "ge": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "le": lambda a, b: a <= b,
+}
+
+
+def tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if not match:
+            raise ValueError(f"Cannot parse $filter at: {text[pos:]}")
+        tokens.append(match.group(1))
+        pos = match.end()
+    return tokens
+
+
+def literal(token):
+    if token.startswith("'"):
+        return token[1:-1].replace("''", "'")
+    return float(token) if "." in token else int(token)
+
+
+#Turns an OData $filter (and/or/not, parentheses, eq/ne/gt/ge/lt/le against a literal) into a
+#function that tells whether a row is kept, the subset of OData the scripts send
+def parse_filter(text):
+    tokens = tokenize(text)
+    pos = 0
+
+    def peek():
+        return tokens[pos].lower() if pos < len(tokens) else None
+
+    def take():
+        nonlocal pos
+        pos += 1
+        return tokens[pos - 1]
+
+    def expression():
+        left = term()
+        while peek() == "or":
+            take()
+            right = term()
+            left = (lambda a, b: lambda row: a(row) or b(row))(left, right)
+        return left
+
+    def term():
+        left = factor()
+        while peek() == "and":
+            take()
+            right = factor()
+            left = (lambda a, b: lambda row: a(row) and b(row))(left, right)
+        return left
+
+    def factor():
+        if peek() == "(":
+            take()
+            inner = expression()
+            if take() != ")":
+                raise ValueError(f"Missing ) in $filter: {text}")
+            return inner
+        if peek() == "not":
+            take()
+            inner = factor()
+            return lambda row: not inner(row)
+
+        field, op, value = take(), take().lower(), literal(take())
+        if op not in COMPARE:
+            raise ValueError(f"Unknown operator {op} in $filter: {text}")
+        compare = COMPARE[op]
+
+        def keep(row):
+            found = row.get(field)
+            if found is None:
+                return False
+            try:
+                return compare(found, value)
+            except TypeError:
+                return False
+        return keep
+
+    try:
+        keep = expression()
+    except IndexError:
+        raise ValueError(f"Incomplete $filter: {text}") from None
+    if pos != len(tokens):
+        raise ValueError(f"Unexpected {tokens[pos]} in $filter: {text}")
+    return keep
+
+
+#Reads the fixtures of a folder: Indicator.json holds the catalog rows and <code>.json (or
+#<code>.json.gz) the rows of each indicator, either as a list or as an OData {"value": [...]} body
+class FixtureStore:
+    def __init__(self, folder):
+        self.folder = folder
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def load(self, name):
+        for path, opener in ((os.path.join(self.folder, f"{name}.json"), open),
+                             (os.path.join(self.folder, f"{name}.json.gz"), gzip.open)):
+            if os.path.exists(path):
+                with opener(path, "rt", encoding="utf-8") as f:
+                    data = json.load(f)
+                return data.get("value", []) if isinstance(data, dict) else data
+        return None
+
+    #Rows of a fixture, read from disk once and then kept in memory
+    def rows(self, name):
+        with self._lock:
+            if name not in self._rows:
+                self._rows[name] = self.load(name)
+            return self._rows[name]
+
+
+#Settings of a running stand-in, shared by every request it answers
+class StandinConfig:
+    def __init__(self, store, page_size=DEFAULT_PAGE_SIZE, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_status=503, seed=None):
+        self.store = store
+        self.page_size = page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            payload = gzip.compress(payload, compresslevel=1)
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        config = self.server.config
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        with config.lock:
+            config.requests += 1
+            delay = config.latency + config.random.uniform(0, config.jitter)
+            fail = config.random.random() < config.error_rate
+            if fail:
+                config.errors += 1
+        if delay:
+            time.sleep(delay)
+        if fail:
+            self.send_body(config.error_status, {"error": "injected by the stand-in"}, {"Retry-After": "1"})
+            return
+
+        name = url.path.rstrip("/").rsplit("/", 1)[-1]
+        rows = config.store.rows(name)
+        if rows is None:
+            self.send_body(404, {"error": f"No fixture for {name}"})
+            return
+
+        try:
+            if "$filter" in query:
+                keep = parse_filter(query["$filter"])
+                rows = [row for row in rows if keep(row)]
+        except ValueError as e:
+            self.send_body(400, {"error": str(e)})
+            return
+
+        skip = int(query.get("$skip", 0))
+        page = rows[skip:skip + config.page_size]
+        if "$select" in query:
+            fields = [f.strip() for f in query["$select"].split(",")]
+            page = [{f: row.get(f) for f in fields} for row in page]
+
+        body = {"@odata.context": f"{self.server.base_url}/$metadata#{name}", "value": page}
+        #The link carries the query options, as GHO's do
+        if skip + config.page_size < len(rows):
+            query["$skip"] = skip + config.page_size
+            body["@odata.nextLink"] = f"{self.server.base_url}{url.path}?{urlencode(query)}"
+        self.send_body(200, body)
+
+
+#Starts the stand-in in a background thread; port 0 picks a free port
+#Point the scripts at it with GHO_API_URL set to server.api_url
+def start_standin(config, host="127.0.0.1", port=0):
+    server = ThreadingHTTPServer((host, port), StandinHandler)
+    server.daemon_threads = True
+    server.config = config
+    server.base_url = f"http://{host}:{server.server_port}"
+    server.api_url = f"{server.base_url}/api"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+#Serves the stand-in until the process is ended, after sending its API URL through queue
+def serve_standin(folder, queue, page_size=DEFAULT_PAGE_SIZE):
+    server = start_standin(StandinConfig(FixtureStore(folder), page_size=page_size))
+    queue.put(server.api_url)
+    threading.Event().wait()
+
+
+#Starts the stand-in in a spawned process of its own and returns that process and the API URL.
+#The fixtures it loads then never count towards the memory of the caller, or of the processes
+#the caller starts; the process ends with the caller
+def start_standin_process(folder, page_size=DEFAULT_PAGE_SIZE):
+    context = get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=serve_standin, args=(folder, queue, page_size), daemon=True)
+    process.start()
+    return process, queue.get()
+
+
+#Three letter codes AAA, AAB, ... used as the synthetic countries
+def country_codes(count):
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return [letters[i // 676 % 26] + letters[i // 26 % 26] + letters[i % 26] for i in range(count)]
+
+
+#Rows of a synthetic indicator with every field GHO returns, so decoding costs the same as the real thing
+def synthetic_rows(code, countries, rng):
+    rows = []
+    spatial = [("COUNTRY", c) for c in countries] + [("REGION", r) for r in FIXTURE_REGIONS]
+    for spatial_type, spatial_dim in spatial:
+        base = rng.uniform(1, 100)
+        for year in FIXTURE_YEARS:
+            for dim1 in FIXTURE_DIM1:
+                value = round(base * rng.uniform(0.8, 1.2), 2)
+                rows.append({
+                    "Id": len(rows) + 1, "IndicatorCode": code,
+                    "SpatialDimType": spatial_type, "SpatialDim": spatial_dim,
+                    "TimeDimType": "YEAR", "TimeDim": year,
+                    "Dim1Type": "SEX", "Dim1": dim1, "Dim2Type": None, "Dim2": None, "Dim3Type": None, "Dim3": None,
+                    "DataSourceDimType": None, "DataSourceDim": None,
+                    "Value": f"{value} [{round(value * 0.9, 2)}-{round(value * 1.1, 2)}]",
+                    "NumericValue": value, "Low": round(value * 0.9, 2), "High": round(value * 1.1, 2),
+                    "Comments": None, "Date": "2024-01-01T00:00:00+01:00",
+                    "TimeDimensionValue": str(year),
+                    "TimeDimensionBegin": f"{year}-01-01T00:00:00+01:00",
+                    "TimeDimensionEnd": f"{year}-12-31T00:00:00+01:00",
+                })
+    return rows
+
+
+#Writes a synthetic catalog and indicator files for the given topics: one indicator per keyword,
+#every tenth of them without data (as many real GHO indicators are), plus unrelated indicators
+#scale multiplies the number of countries and so the rows of every indicator
+def make_fixtures(folder, topics, scale=1, seed=0):
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(seed)
+    countries = country_codes(int(FIXTURE_COUNTRIES * scale))
+
+    catalog = []
+    for topic in topics:
+        for keyword in topic.keywords:
+            code = f"SYN_{len(catalog):05d}"
+            catalog.append({"IndicatorCode": code, "IndicatorName": f"{keyword} (synthetic)", "Language": "EN"})
+    for i in range(len(catalog) // 2):
+        catalog.append({"IndicatorCode": f"OTHER_{i:05d}", "IndicatorName": f"Unrelated indicator {i}",
+                        "Language": "EN"})
+
+    with open(os.path.join(folder, "Indicator.json"), "w", encoding="utf-8") as f:
+        json.dump(catalog, f)
+
+    rows_written = 0
+    for i, entry in enumerate(catalog):
+        code = entry["IndicatorCode"]
+        rows = [] if i % 10 == 9 else synthetic_rows(code, countries, rng)
+        with gzip.open(os.path.join(folder, f"{code}.json.gz"), "wt", encoding="utf-8", compresslevel=1) as f:
+            json.dump(rows, f)
+        rows_written += len(rows)
+
+    return len(catalog), rows_written
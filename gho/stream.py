@@ -0,0 +1,208 @@
+import codecs
+import json
+import math
+from array import array
+
+import numpy as np
+import pandas as pd
+
+
+#GHO fields that always hold a number or null, kept as packed doubles instead of Python floats
+FLOAT_FIELDS = {"NumericValue", "Low", "High"}
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
+#Bytes at the end of a page searched for its @odata.nextLink, which GHO writes after value[]
+TAIL_BYTES = 8 * 1024
+NEXT_LINK_KEY = b'"@odata.nextLink"'
+
+_decoder = json.JSONDecoder()
+
+
+#Reads JSON values one at a time from a stream of byte chunks
+class JSONStream:
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.text = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    #Drops what has been read already and appends the next chunk, returns False at the end of the stream
+    def fill(self):
+        if self.eof:
+            return False
+
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            self.buf = self.buf[self.pos:] + self.text.decode(b"", final=True)
+        else:
+            self.buf = self.buf[self.pos:] + self.text.decode(chunk)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def next_char(self):
+        ch = self.peek()
+        self.pos += 1
+        return ch
+
+    def expect(self, expected):
+        ch = self.next_char()
+        if ch not in expected:
+            raise ValueError(f"Expected one of {expected!r} in GHO response, got {ch!r}")
+        return ch
+
+    #Decodes one complete value, reading more of the stream until the value is whole
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            #A number that stops at the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+#Column buffers filled one row at a time; only the wanted fields of a row are ever kept
+class ColumnBuffers:
+    def __init__(self, columns=None):
+        self.fixed = columns is not None
+        self.columns = {}
+        self.rows = 0
+        for name in columns or []:
+            self.columns[name] = self.new_buffer(name)
+
+    def new_buffer(self, name):
+        if name in FLOAT_FIELDS:
+            return array("d", [math.nan] * self.rows)
+        return [None] * self.rows
+
+    def append(self, row):
+        if not self.fixed:
+            for name in row:
+                if name not in self.columns:
+                    self.columns[name] = self.new_buffer(name)
+
+        for name, buffer in self.columns.items():
+            value = row.get(name)
+            if name in FLOAT_FIELDS:
+                buffer.append(math.nan if value is None else float(value))
+            else:
+                buffer.append(value)
+        self.rows += 1
+
+    #Packed doubles are handed to pandas without going through Python floats again
+    def to_frame(self):
+        data = {}
+        for name, buffer in self.columns.items():
+            data[name] = np.frombuffer(buffer, dtype="float64") if isinstance(buffer, array) else buffer
+        return pd.DataFrame(data, columns=list(self.columns))
+
+
+#Builds one DataFrame from the column buffers of many indicators, in the order they are given
+#Each column is copied once straight from the buffers, with no per-indicator frames to concatenate,
+#and IndicatorCode becomes a categorical: one small integer per row instead of a repeated string
+def build_frame(parts):
+    parts = [(code, buffers) for code, buffers in parts if buffers is not None and buffers.rows]
+    if not parts:
+        return pd.DataFrame()
+
+    names = list(dict.fromkeys(name for _, buffers in parts for name in buffers.columns))
+    if "IndicatorCode" not in names:
+        names.append("IndicatorCode")
+
+    data = {}
+    for name in names:
+        if name == "IndicatorCode":
+            codes = np.repeat(np.arange(len(parts)), [buffers.rows for _, buffers in parts])
+            data[name] = pd.Categorical.from_codes(codes, categories=[code for code, _ in parts])
+        elif name in FLOAT_FIELDS:
+            data[name] = np.concatenate([
+                np.frombuffer(buffers.columns[name], dtype="float64") if name in buffers.columns
+                else np.full(buffers.rows, np.nan)
+                for _, buffers in parts
+            ])
+        else:
+            values = []
+            for _, buffers in parts:
+                values.extend(buffers.columns.get(name) or [None] * buffers.rows)
+            data[name] = values
+
+    return pd.DataFrame(data, columns=names)
+
+
+#Decodes a GHO response body without building the full list of row dicts
+#Returns the column buffers of value[] and the other top-level keys (e.g. @odata.nextLink)
+#Rows are appended to buffers when given (to gather several pages), and on_meta is called
+#with every other top-level key as soon as it is decoded
+def decode_columns(chunks, columns=None, buffers=None, on_meta=None):
+    stream = JSONStream(chunks)
+    buffers = buffers if buffers is not None else ColumnBuffers(columns)
+    meta = {}
+
+    stream.expect("{")
+    if stream.peek() == "}":
+        return buffers, meta
+
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if key == "value":
+            stream.expect("[")
+            if stream.peek() == "]":
+                stream.next_char()
+            else:
+                while True:
+                    buffers.append(stream.value())
+                    if stream.expect(",]") == "]":
+                        break
+        else:
+            meta[key] = stream.value()
+            if on_meta is not None:
+                on_meta(key, meta[key])
+
+        if stream.expect(",}") == "}":
+            return buffers, meta
+
+
+#@odata.nextLink of a downloaded page, read from its tail without decoding the rows, so the next
+#page can be requested before this one is decoded. None when the tail holds no top-level link
+def tail_next_link(content):
+    tail = content[-TAIL_BYTES:]
+    at = tail.rfind(NEXT_LINK_KEY)
+    if at < 0:
+        return None
+
+    text = tail[at + len(NEXT_LINK_KEY):].decode("utf-8", errors="replace").lstrip(WHITESPACE)
+    if not text.startswith(":"):
+        return None
+    text = text[1:].lstrip(WHITESPACE)
+    try:
+        link, end = _decoder.raw_decode(text)
+    except json.JSONDecodeError:
+        return None
+    rest = text[end:].lstrip(WHITESPACE)
+    if not isinstance(link, str) or not rest.startswith(("}", ",")):
+        return None
+    return link
+
+
+def decode_response(resp, columns=None, buffers=None, on_meta=None):
+    return decode_columns(resp.iter_content(chunk_size=CHUNK_SIZE), columns, buffers, on_meta)
@@ -0,0 +1,40 @@
+import os
+import sys
+
+#Makes the shared gho package at the root of the repository importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gho import build_parser, load_registry, options_from_args, run_topics, run_topics_in_blocks, select_topics
+
+
+if __name__ == "__main__":
+    registry = load_registry()
+
+    parser = build_parser("Run any set of the WHO GHO topics declared in topics.toml in one process")
+    parser.add_argument("--topics", default=None,
+                        help="comma separated topics to run (default all): " + ", ".join(registry))
+    parser.add_argument("--memory-budget", type=float, default=None, metavar="MB",
+                        help="reshape out of core: spool every indicator to disk and build the outputs in blocks "
+                             "of rows that fit in this many MB")
+    parser.add_argument("--reshape-workers", type=int, default=1, metavar="N",
+                        help="reshape in N worker processes: the blocks of indicators of every topic are "
+                             "shared out over them (default 1, no pool)")
+    args = parser.parse_args()
+    options = options_from_args(args)
+    if args.memory_budget is not None:
+        if args.memory_budget <= 0:
+            raise SystemExit("--memory-budget must be a positive number of MB")
+        if options.cube:
+            raise SystemExit("--cube keeps every row in memory, it cannot be combined with --memory-budget")
+        options.memory_budget = args.memory_budget
+    if args.reshape_workers < 1:
+        raise SystemExit("--reshape-workers must be at least 1")
+    if args.reshape_workers > 1 and options.cube:
+        raise SystemExit("--cube keeps every row in memory, it cannot be combined with --reshape-workers")
+    options.reshape_workers = args.reshape_workers
+
+    names = [t.strip() for t in args.topics.split(",")] if args.topics else None
+    topics = select_topics(registry, names)
+    if options.memory_budget or options.reshape_workers > 1:
+        run_topics_in_blocks(topics, options)
+    else:
+        run_topics(topics, options)
@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+import time
+
+#Makes the shared gho package at the root of the repository importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gho import load_registry, select_topics
+from gho.standin import DEFAULT_PAGE_SIZE, FixtureStore, StandinConfig, make_fixtures, start_standin
+
+
+if __name__ == "__main__":
+    registry = load_registry()
+
+    parser = argparse.ArgumentParser(description="Serve a local stand-in of the WHO GHO OData API from fixture files")
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".gho_fixtures"),
+                        help="folder holding Indicator.json and one <code>.json(.gz) per indicator (default .gho_fixtures)")
+    parser.add_argument("--make-fixtures", action="store_true",
+                        help="write synthetic fixtures for the topics of topics.toml into --fixtures first")
+    parser.add_argument("--topics", default=None,
+                        help="comma separated topics to make fixtures for (default all): " + ", ".join(registry))
+    parser.add_argument("--scale", type=float, default=1,
+                        help="multiplies the rows of every synthetic indicator, e.g. 100 (default 1)")
+    parser.add_argument("--port", type=int, default=8770, help="port to listen on (default 8770)")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"rows per page before an @odata.nextLink is sent (default {DEFAULT_PAGE_SIZE})")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many random seconds added on top of --latency")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="share of requests answered with --error-status instead, e.g. 0.05")
+    parser.add_argument("--error-status", type=int, default=503, help="status of the injected errors (default 503)")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the injected latency and errors")
+    args = parser.parse_args()
+
+    if args.page_size < 1 or args.scale <= 0 or not 0 <= args.error_rate <= 1:
+        raise SystemExit("--page-size and --scale must be positive and --error-rate between 0 and 1")
+
+    if args.make_fixtures:
+        names = [t.strip() for t in args.topics.split(",")] if args.topics else None
+        start = time.perf_counter()
+        indicators, rows = make_fixtures(args.fixtures, select_topics(registry, names), args.scale)
+        print(f"Wrote {indicators} indicators and {rows} rows to {args.fixtures} in {time.perf_counter() - start:.1f}s")
+
+    if not os.path.exists(os.path.join(args.fixtures, "Indicator.json")):
+        raise SystemExit(f"No Indicator.json in {args.fixtures}, run with --make-fixtures first")
+
+    config = StandinConfig(FixtureStore(args.fixtures), args.page_size, args.latency, args.jitter,
+                           args.error_rate, args.error_status, args.seed)
+    server = start_standin(config, port=args.port)
+    print(f"Serving {args.fixtures} at {server.api_url}")
+    print(f"Point the scripts at it with GHO_API_URL={server.api_url} (and a separate GHO_CACHE_DIR)")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"\nAnswered {config.requests} requests, {config.errors} of them with an injected error")
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from gho.index import CatalogIndex, keyword_report
+from gho.registry import Topic
+
+
+def catalog():
+    return CatalogIndex.from_catalog(pd.DataFrame({
+        "IndicatorCode": ["NCD_PAC", "NCD_PAA", "SA_0000001400"],
+        "IndicatorName": ["Prevalence of insufficient physical activity among adults",
+                          "Prevalence of insufficient physical activity among adolescents",
+                          "Alcohol, recorded per capita consumption"],
+    }))
+
+
+def test_search_by_code_fragment():
+    index = catalog()
+    assert index.search("NCD_PAC") == [("NCD_PAC", "Prevalence of insufficient physical activity among adults")]
+    assert [code for code, _ in index.search("ncd_pa")] == ["NCD_PAC", "NCD_PAA"]
+    assert [code for code, _ in index.search("SA_00000014")] == ["SA_0000001400"]
+
+
+def test_search_by_name():
+    assert [code for code, _ in catalog().search("alcohol")] == ["SA_0000001400"]
+
+
+def test_keywords_only_match_names():
+    topic = Topic("NCD", "NCD.py", "NCD", ["NCD", "physical activity"], "COUNTRY", "a.csv", "b.csv")
+    hits = {r["keyword"]: r["hits"] for r in keyword_report([topic], catalog())}
+    assert hits == {"NCD": 0, "physical activity": 2}
@@ -0,0 +1,44 @@
+import json
+
+from gho import FetchOptions
+from gho.client import GHO_API_URL
+from gho.fetch import FetchReport
+from gho.negative import NEGATIVE_FILE, open_negative_cache
+
+
+def record_empty(options, code):
+    report = FetchReport()
+    report.record(code, 0.1, 200, 0)
+    known_empty = open_negative_cache(options)
+    known_empty.update(report, {code}, {code})
+    known_empty.save()
+
+
+def test_codes_empty_in_a_cassette_are_fetched_from_the_api(tmp_path):
+    replay = FetchOptions(cache_dir=str(tmp_path), replay=str(tmp_path / "cassette"))
+    record_empty(replay, "SYN_00001")
+
+    assert open_negative_cache(replay).split(["SYN_00001"]) == ([], ["SYN_00001"])
+    live = FetchOptions(cache_dir=str(tmp_path))
+    assert open_negative_cache(live).split(["SYN_00001"]) == (["SYN_00001"], [])
+
+
+def test_each_source_keeps_its_own_codes(tmp_path):
+    live = FetchOptions(cache_dir=str(tmp_path))
+    replay = FetchOptions(cache_dir=str(tmp_path), replay=str(tmp_path / "cassette"))
+    record_empty(live, "SYN_00001")
+    record_empty(replay, "SYN_00002")
+
+    assert open_negative_cache(live).split(["SYN_00001", "SYN_00002"]) == (["SYN_00002"], ["SYN_00001"])
+    assert open_negative_cache(replay).split(["SYN_00001", "SYN_00002"]) == (["SYN_00001"], ["SYN_00002"])
+
+
+def test_a_file_without_sources_is_ignored(tmp_path):
+    with open(tmp_path / NEGATIVE_FILE, "w", encoding="utf-8") as f:
+        json.dump({"SYN_00001": {"checked": 9e12, "reason": "empty"}}, f)
+
+    known_empty = open_negative_cache(FetchOptions(cache_dir=str(tmp_path)))
+    assert known_empty.split(["SYN_00001"]) == (["SYN_00001"], [])
+    known_empty.save()
+    with open(tmp_path / NEGATIVE_FILE, encoding="utf-8") as f:
+        assert list(json.load(f)["sources"]) == [GHO_API_URL]
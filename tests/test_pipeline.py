@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from gho import FetchOptions, load_registry
+from gho.chunked import clean_block
+from gho.pipeline import clean_and_reshape, find_indicators
+
+
+#AMR-shaped rows: two regions, one of them without a value in 2019
+def amr_rows():
+    return pd.DataFrame({
+        "SpatialDim": ["AFR", "AFR", "EUR", "EUR"],
+        "TimeDim": [2018, 2019, 2018, 2019],
+        "IndicatorCode": ["AMR_GLASS_1"] * 4,
+        "NumericValue": [1.5, np.nan, 2.5, 3.5],
+    })
+
+
+def test_amr_drops_rows_without_a_value():
+    topic = load_registry()["AMR"]
+    clean, wide = clean_and_reshape(topic, amr_rows())
+
+    assert list(clean.columns) == ["REGION", "YEAR", "IndicatorCode", "NumericValue"]
+    assert clean["NumericValue"].notna().all()
+    assert list(zip(clean["REGION"], clean["YEAR"])) == [("AFR", 2018), ("EUR", 2018), ("EUR", 2019)]
+    assert np.isnan(wide.loc["AFR", ("AMR_GLASS_1", 2019)])
+
+
+def test_amr_block_engine_drops_rows_without_a_value():
+    topic = load_registry()["AMR"]
+    clean = clean_block(topic, amr_rows(), FetchOptions())
+    assert len(clean) == 3
+    assert clean["NumericValue"].notna().all()
+
+
+def test_other_topics_keep_rows_without_a_value():
+    topic = load_registry()["HIV"]
+    clean, _ = clean_and_reshape(topic, amr_rows())
+    assert len(clean) == 4
+    assert clean["NumericValue"].isna().sum() == 1
+
+
+def test_find_indicators_matches_keywords_as_the_suite_does(tmp_path):
+    catalog = pd.DataFrame({
+        "IndicatorCode": ["GDO_2", "GDO_1", "GDO_3", "OTHER"],
+        "IndicatorName": ["Dementia sub-national plans", "Existence of a DEMENTIA PLAN", None, "Malaria cases"],
+    })
+    options = FetchOptions(cache_dir=str(tmp_path))
+    found = find_indicators(load_registry()["GDO"], catalog, options)
+    assert list(found["IndicatorCode"]) == ["GDO_1", "GDO_2"]
+
+    #The second lookup reads the mapping cached by the first
+    assert (tmp_path / "topic_matches.json").exists()
+    assert find_indicators(load_registry()["GDO"], catalog, options).equals(found)
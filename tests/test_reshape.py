@@ -0,0 +1,40 @@
+import io
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gho.reshape import pivot_wide
+
+
+#Rows of a few countries, indicators and years, some cells repeated up to max_rows times
+def long_rows(seed, max_rows, dtype="float64"):
+    rng = np.random.default_rng(seed)
+    cells = np.repeat(np.arange(400), rng.integers(1, max_rows + 1, 400))
+    vals = rng.normal(0, 1e3, len(cells))
+    vals[rng.random(len(cells)) < 0.05] = np.nan
+    vals[rng.random(len(cells)) < 0.02] = np.inf
+    vals[rng.random(len(cells)) < 0.05] = -0.0
+    df = pd.DataFrame({"COUNTRY": [f"C{c % 17:02d}" for c in cells], "IndicatorCode": [f"I{c // 17 % 5}" for c in cells],
+                       "YEAR": 2000 + cells // 85, "NumericValue": vals.astype(dtype)})
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("max_rows", [1, 3, 40])
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_pivot_wide_matches_pivot_table(max_rows, dtype):
+    df = long_rows(max_rows, max_rows, dtype)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = df.pivot_table(index="COUNTRY", columns=["IndicatorCode", "YEAR"], values="NumericValue")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        wide = pivot_wide(df, "COUNTRY", ["IndicatorCode", "YEAR"], "NumericValue")
+
+    assert wide.equals(expected)
+    a, b = io.StringIO(), io.StringIO()
+    expected.to_csv(a)
+    wide.to_csv(b)
+    assert a.getvalue() == b.getvalue()